@@ -1,5 +1,7 @@
 from .command import Command
 from world.menu import Menu
+from world.utils import partial_match, LazyRenderable
+from world.story.exceptions import StoryDBException
 
 
 class Sheet(Command):
@@ -10,7 +12,7 @@ class Sheet(Command):
         if self.args:
             pass
 
-        self.msg(target.story_sheet.render())
+        self.msg(target.story_sheet.render(), paged=True)
 
 
 class Editor(Command):
@@ -22,5 +24,176 @@ class Editor(Command):
             pass
 
         self.caller.ndb.target = target
+        self.caller.ndb._editor_sections = dict()
         Menu(self.caller, "world.story.editor",
              startnode="template")
+
+
+class Sheets(Command):
+    """
+    Review the sheets of many characters at once.
+
+    Usage:
+        +sheets <character>[,<character>...]
+        +sheets template=<kind>
+        +sheets template=<kind>/<field>=<value>
+
+    The last form only lists characters whose extra field, such as a Lunar's Spirit Shape, has that value.
+
+    Output is paged; use 'more' to continue.
+    """
+    key = "+sheets"
+    locks = "cmd:perm(Builder)"
+    help_category = "Admin"
+    page_size = 10
+
+    def characters(self):
+        from django.db.models import Q
+        from evennia.objects.models import ObjectDB
+        from world.story.templates import TEMPLATE_INDEX
+
+        args = self.args.strip()
+        if "=" in args:
+            lhs, rhs = [a.strip() for a in args.split("=", 1)]
+            if not partial_match(lhs, ["template"]):
+                self.msg("Usage: +sheets template=<kind>[/<field>=<value>]")
+                return None
+            rhs, _, field_filter = rhs.partition("/")
+            try:
+                kind = TEMPLATE_INDEX.find_kind(rhs.strip())
+            except StoryDBException as err:
+                self.msg(str(err))
+                return None
+            query = ObjectDB.objects.filter(db_typeclass_path__in=TEMPLATE_INDEX.paths[kind])
+            if field_filter:
+                if (found := self.field_filter(kind, field_filter)) is None:
+                    return None
+                field, value = found
+                query = query.filter(db_extra_fields__field=field, db_extra_fields__value=value)
+            return list(query.order_by("db_key"))
+
+        if not (names := [n.strip() for n in args.split(",") if n.strip()]):
+            self.msg("Usage: +sheets <character>[,<character>...]")
+            return None
+        query = Q()
+        for name in names:
+            query |= Q(db_key__iexact=name)
+        return list(ObjectDB.objects.filter(query, db_typeclass_path__in=TEMPLATE_INDEX.all_paths).order_by("db_key"))
+
+    def field_filter(self, kind: str, text: str):
+        from world.story.templates import TEMPLATE_INDEX
+
+        field, _, value = [t.strip() for t in text.partition("=")]
+        if not field or not value:
+            self.msg("Usage: +sheets template=<kind>/<field>=<value>")
+            return None
+        fields = dict()
+        for path in TEMPLATE_INDEX.paths[kind]:
+            fields.update(TEMPLATE_INDEX.classes[path].extra_fields)
+        if not (choice := partial_match(field, fields.keys())):
+            self.msg(f"{kind} has no field '{field}'.")
+            return None
+        # values are stored exactly as chosen, so resolve choices to their stored spelling.
+        if isinstance(options := fields[choice], list) and not (value := partial_match(value, options)):
+            self.msg(f"Not a valid choice for {choice}! Choices are: {', '.join(options)}")
+            return None
+        return choice, value
+
+    def func(self):
+        from world.story.sheet import render_summaries
+
+        if (characters := self.characters()) is None:
+            return
+        if not characters:
+            self.msg("No characters found.")
+            return
+
+        # summaries are loaded and laid out a page of characters at a time, as the pager asks for them.
+        self.msg(LazyRenderable(render_summaries(characters, page_size=self.page_size)), paged=True)
+
+
+class More(Command):
+    """
+    Show the next page of paged output.
+
+    Usage:
+        more
+    """
+    key = "more"
+    aliases = ["next"]
+
+    def func(self):
+        if not self.session:
+            return
+        self.session.page_next()
+
+
+class Approve(Command):
+    """
+    Check a character against their template's chargen rules, and approve them if everything is spent.
+
+    Usage:
+        +approve <character>
+    """
+    key = "+approve"
+    locks = "cmd:perm(Builder)"
+    help_category = "Admin"
+
+    def func(self):
+        from world.story.chargen import ChargenValidator
+
+        if not self.args.strip():
+            self.msg("Usage: +approve <character>")
+            return
+        if not (target := self.caller.search(self.args.strip(), global_search=True)):
+            return
+        if not hasattr(target, "story_snapshot"):
+            self.msg(f"{target} has no character sheet.")
+            return
+
+        result = ChargenValidator(target).validate()
+        lines = [str(budget) for budget in result.budgets.values()]
+        lines.extend([f"ERROR: {err}" for err in result.all_errors()])
+        if not result.complete:
+            lines.append(f"{target} cannot be approved yet.")
+            self.msg("\n".join(lines))
+            return
+
+        target.db.approved = True
+        lines.append(f"{target} has been approved.")
+        self.msg("\n".join(lines))
+        if target != self.caller:
+            target.msg(f"You have been approved by {self.caller}.")
+
+
+class Templates(Command):
+    """
+    List the available Templates, or recompile them from the template definition file.
+
+    Usage:
+        +templates
+        +templates/reload
+
+    Reloading only swaps in new definitions if the file changed, and updates the existing templates in
+    place. Adding, removing or renaming templates needs a server reload instead.
+    """
+    key = "+templates"
+    locks = "cmd:perm(Developer)"
+    help_category = "Admin"
+
+    def func(self):
+        from world.story import templates
+
+        if self.args.strip().lower() == "/reload":
+            try:
+                changed = templates.load_templates()
+            except ValueError as err:
+                self.msg(f"ERROR: {err}")
+                return
+            if not changed:
+                self.msg("Template definitions are unchanged.")
+                return
+            self.msg(f"Template definitions reloaded ({templates.TEMPLATE_INDEX.digest[:12]}).")
+            return
+
+        self.msg("\n".join(templates.TEMPLATE_INDEX.listing))
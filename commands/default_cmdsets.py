@@ -16,6 +16,7 @@ own cmdsets by inheriting from them or directly from `evennia.CmdSet`.
 
 from evennia import default_cmds, CmdSet
 from . import character as c
+from . import play as p
 
 
 class CharacterCmdSet(default_cmds.CharacterCmdSet):
@@ -37,6 +38,10 @@ class CharacterCmdSet(default_cmds.CharacterCmdSet):
         #
         self.add(c.Sheet)
         self.add(c.Editor)
+        self.add(c.Sheets)
+        self.add(c.Approve)
+        self.add(c.Templates)
+        self.add(p.Plays)
 
 
 
@@ -98,6 +103,7 @@ class SessionCmdSet(default_cmds.SessionCmdSet):
         #
         # any commands you add below will overload the default ones.
         #
+        self.add(c.More)
 
 
 class PlayCmdSet(CmdSet):
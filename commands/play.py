@@ -0,0 +1,28 @@
+from .command import Command
+
+
+class Plays(Command):
+    """
+    Show Play lifecycle metrics for this server process.
+
+    Usage:
+        +plays
+
+    Times are in seconds. Counters start from zero when the server starts. The same data is available as
+    JSON at /api/plays/metrics/.
+    """
+    key = "+plays"
+    locks = "cmd:perm(Builder)"
+    help_category = "Admin"
+
+    def func(self):
+        from world.plays.metrics import METRICS
+        from world.plays.registry import PLAYS
+
+        data = METRICS.to_dict(registry=PLAYS)
+        lines = [f"Play metrics (uptime {data['uptime']:.0f}s):"]
+        lines.extend(f"  {k}: {v}" for k, v in data["gauges"].items())
+        lines.extend(f"  {k}: {v}" for k, v in data["counters"].items())
+        for name, hist in data["histograms"].items():
+            lines.append(f"  {name}: count {hist['count']}, mean {hist['mean']:.4f}, max {hist['max']:.4f}")
+        self.msg("\n".join(lines))
@@ -28,6 +28,7 @@ as argument.
 
 from commands.cmdhandler import cmdhandler
 from evennia.server.inputfuncs import _IDLE_COMMAND
+from world.plays.registry import PLAYS
 
 
 def text(session, *args, **kwargs):
@@ -67,5 +68,7 @@ def text(session, *args, **kwargs):
                 txt, categories=("inputline", "channel"), include_account=False
             )
     kwargs.pop("options", None)
+    if (play := getattr(session, "play", None)):
+        PLAYS.touch(play)
     cmdhandler(session, txt, callertype="session", session=session, **kwargs)
     session.update_session_counters()
@@ -24,15 +24,58 @@ settings file:
 from evennia.server.serversession import ServerSession as BaseServerSession
 from django.conf import settings
 from rich.color import ColorSystem
+from rich.segment import Segment, Segments
+from itertools import islice
 from twisted.internet.defer import inlineCallbacks, returnValue
 from evennia.server.serversession import _BASE_SESSION_CLASS
-from world.plays.plays import DefaultPlay
+from twisted.internet import reactor
+from world.plays.registry import PLAYS
 from evennia.utils.utils import make_iter, lazy_property, class_from_module
 
 _ObjectDB = None
 _PlayTC = None
 _Select = None
 
+# Sessions waiting to be reattached to their Plays after a reload.
+_RESYNC = list()
+
+
+def _reattach_sessions():
+    sessions = list(_RESYNC)
+    _RESYNC.clear()
+    PLAYS.reattach(sessions)
+
+
+class Pager:
+    """
+    Lays out a renderable lazily against a session's console and hands it out one screen at a time.
+    Lines are pulled from Rich's render generator only as pages are requested, so pages already sent are
+    not kept and pages never requested are never laid out.
+    """
+
+    def __init__(self, console, renderable):
+        self.lines = Segment.split_lines(console.render(renderable, console.options))
+        self.peeked = None
+        self.sent = 0
+
+    def next_page(self, height: int):
+        """
+        Returns the next page as a Segments renderable, and whether there is anything after it.
+        """
+        lines = list()
+        if self.peeked is not None:
+            lines.append(self.peeked)
+            self.peeked = None
+        lines.extend(islice(self.lines, height - len(lines)))
+        self.peeked = next(self.lines, None)
+        self.sent += len(lines)
+
+        segments = list()
+        for line in lines:
+            segments.extend(line)
+            segments.append(Segment.line())
+        return Segments(segments), self.peeked is not None
+
 
 class ServerSession(BaseServerSession):
     """
@@ -48,6 +91,7 @@ class ServerSession(BaseServerSession):
     def __init__(self):
         super().__init__()
         self.play = None
+        self.pager = None
 
     @lazy_property
     def console(self):
@@ -100,16 +144,83 @@ class ServerSession(BaseServerSession):
         self.console.print(*args, highlight=False, **kwargs)
         return self.console.export_text(clear=True, styles=True)
 
+    @lazy_property
+    def output(self):
+        from world.plays.plays import OutputQueue
+        return OutputQueue(self)
+
+    def render_key(self) -> tuple:
+        """
+        Sessions with the same render_key get identical output from print(), so it can be shared.
+        """
+        return self.console.width, self.console.color_system
+
+    def screen_height(self) -> int:
+        if "SCREENHEIGHT" in self.protocol_flags:
+            return self.protocol_flags["SCREENHEIGHT"][0]
+        return 24
+
+    def page(self, renderable):
+        """
+        Starts paging a renderable, replacing anything that was being paged before, and sends the first page.
+        """
+        self.pager = Pager(self.console, renderable)
+        self.page_next()
+
+    def page_next(self):
+        """
+        Sends the next page of the current pager. Called by the 'more' command.
+        """
+        self.flush_output()
+        if not self.pager:
+            super().data_out(text="There is nothing more to display.")
+            return
+        page, more = self.pager.next_page(max(self.screen_height() - 1, 1))
+        text = self.print(page)
+        if more:
+            text += f"-- More ({self.pager.sent} lines shown). Type 'more' to continue. --"
+        else:
+            self.pager = None
+        super().data_out(text=text)
+
     def msg(self, text=None, **kwargs):
         if text is not None:
             if hasattr(text, "__rich_console__"):
-                text = self.print(text)
+                if kwargs.pop("paged", False):
+                    self.page(text)
+                    if not set(kwargs) - {"options"}:
+                        return
+                    text = None
+                else:
+                    text = self.print(text)
+        kwargs.pop("paged", None)
         super().msg(text=text, **kwargs)
 
+    def flush_output(self):
+        """
+        Sends any Play output still queued for this Session, so that output sent directly can't overtake it.
+        """
+        if (queue := self.__dict__.get("output", None)) is not None:
+            queue.flush()
+
     def data_out(self, **kwargs):
+        self.flush_output()
+        self.send_data(**kwargs)
+
+    def send_data(self, **kwargs):
+        """
+        Sends output to the client without touching the Play output queue. Used by the queue itself.
+        """
+        paged = kwargs.pop("paged", False)
         if (t := kwargs.get("text", None)):
             if hasattr(t, "__rich_console__"):
-                kwargs["text"] = self.print(t)
+                if paged:
+                    kwargs.pop("text")
+                    self.page(t)
+                    if not set(kwargs) - {"options"}:
+                        return
+                else:
+                    kwargs["text"] = self.print(t)
         super().data_out(**kwargs)
 
     def get_cmd_objects(self):
@@ -153,10 +264,11 @@ class ServerSession(BaseServerSession):
             # hooks, echoes or access checks.
 
             # PLAY UPDATE: PlayDB pks use ObjectID PKs, so we can
-            # slip in some changes here.
-
-            play = DefaultPlay.objects.get(id=self.puid)
-            play.add_session(self)
+            # slip in some changes here. The portal resyncs every Session
+            # in one loop, so they are collected and reattached together.
+            _RESYNC.append(self)
+            if len(_RESYNC) == 1:
+                reactor.callLater(0, _reattach_sessions)
 
     def get_puppet(self):
         """
@@ -41,7 +41,9 @@ INSTALLED_APPS.extend([
 ])
 
 SYSTEMS = [
-    "world.systems.PlaySystem"
+    "world.systems.StorySystem",
+    "world.systems.PlaySystem",
+    "world.systems.MenuSystem"
 ]
 
 MULTISESSION_MODE = 3
@@ -61,6 +63,29 @@ PLAYS_PER_ACCOUNT = None
 # forcibly terminated.
 PLAY_TIMEOUT_SECONDS = 30.0
 
+# How often, in seconds, every Play's heartbeat and last activity time are written to the database.
+# They are also written when the server stops.
+PLAY_HEARTBEAT_INTERVAL = 5.0
+
+# Longest, in seconds, a single Play heartbeat may take before it's counted as an overrun in the Play
+# metrics. Kept at the one second the loop used to run on, independent of PLAY_HEARTBEAT_INTERVAL.
+PLAY_TICK_BUDGET = 1.0
+
+# Output a Play sends is queued per Session. At most PLAY_OUTPUT_QUEUE_SIZE messages wait in a queue
+# (older ones are dropped past that), and up to PLAY_OUTPUT_BATCH are sent per reactor turn.
+PLAY_OUTPUT_QUEUE_SIZE = 200
+PLAY_OUTPUT_BATCH = 20
+# What happens to prompts waiting in a queue: "merge" keeps only the newest one and sends it after the
+# other queued output, "drop" discards a prompt if other output is still waiting.
+PLAY_PROMPT_POLICY = "merge"
+
+# How often, in seconds, persistent menus write their current node to the database.
+# Pending writes are also flushed on disconnect and when the server stops.
+MENU_SAVE_INTERVAL = 5.0
+
+# The YAML or JSON file Templates are compiled from. Staff can reload it with +templates/reload.
+STORY_TEMPLATES_FILE = os.path.join(GAME_DIR, "world", "story", "templates.yaml")
+
 BASE_CHARACTER_TYPECLASS = "world.story.templates.Mortal"
 
 
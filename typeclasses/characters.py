@@ -14,6 +14,7 @@ from evennia.utils.utils import lazy_property
 from world.story import stats
 from world.story.powers import CharmHandler, SpellHandler, EvocationHandler
 from world.story.sheet import SheetHandler
+from world.story.snapshot import SnapshotHandler
 
 
 class Character(ObjectParent, DefaultCharacter):
@@ -37,6 +38,19 @@ class Character(ObjectParent, DefaultCharacter):
 
     """
 
+    story_handlers = ("story_advantages", "story_attributes", "story_abilities", "story_styles", "story_crafts",
+                      "story_charms", "story_spells", "story_evocations")
+
+    def reset_story_handlers(self):
+        """
+        Discards every loaded stat and power handler, along with the rows they cached, so that the next
+        access reloads them from the database. Used after bulk writes that bypass the handlers.
+        """
+        for name in self.story_handlers:
+            self.__dict__.pop(name, None)
+        self.story_snapshot.invalidate()
+        self.invalidate_prompt()
+
     @lazy_property
     def story_advantages(self):
         return stats.AdvantageHandler(self)
@@ -72,3 +86,7 @@ class Character(ObjectParent, DefaultCharacter):
     @lazy_property
     def story_sheet(self):
         return SheetHandler(self)
+
+    @lazy_property
+    def story_snapshot(self):
+        return SnapshotHandler(self)
@@ -12,10 +12,9 @@ inheritance.
 """
 from evennia.objects.objects import DefaultObject
 from itertools import chain
-from django.core.exceptions import ObjectDoesNotExist
 from evennia.utils.utils import make_iter, to_str, logger
 from twisted.internet.defer import inlineCallbacks, returnValue
-from world.plays.models import PlayDB
+from world.plays.registry import PLAYS
 
 
 class ObjectParent:
@@ -96,14 +95,10 @@ class ObjectParent:
         returnValue(extra)
 
     def get_play(self):
-        return PlayDB.objects.filter(id=self).first()
+        return PLAYS.get(self.pk)
 
     def get_puppeteer(self):
-        try:
-            if hasattr(self, "puppeteer") and self.puppeteer.db_account:
-                return self.puppeteer
-        except ObjectDoesNotExist:
-            return None
+        return PLAYS.puppeteer(self.pk)
 
     def msg(self, text=None, from_obj=None, session=None, options=None, **kwargs):
         # try send hooks
@@ -183,6 +178,17 @@ class ObjectParent:
             return puppeteer.connection_time
         return None
 
+    def render_prompt(self):
+        """
+        Returns the prompt shown to whoever is playing this object after they receive text, or None for no
+        prompt. The result is cached by the Play, so call invalidate_prompt() when anything it shows changes.
+        """
+        return None
+
+    def invalidate_prompt(self):
+        if (puppeteer := self.get_puppeteer()):
+            puppeteer.prompt.invalidate()
+
     def at_possess(self, play):
         pass
 
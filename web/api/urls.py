@@ -0,0 +1,11 @@
+"""
+Machine-readable endpoints, included by web/urls.py under api/.
+
+"""
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("plays/metrics/", views.play_metrics, name="play-metrics"),
+]
@@ -0,0 +1,14 @@
+from django.http import JsonResponse
+
+
+def play_metrics(request):
+    """
+    Play lifecycle metrics as JSON, for Builders and above.
+    """
+    from world.plays.metrics import METRICS
+    from world.plays.registry import PLAYS
+
+    user = request.user
+    if not (user.is_authenticated and user.locks.check_lockstring(user, "perm(Builder)")):
+        return JsonResponse({"error": "Permission denied."}, status=403)
+    return JsonResponse(METRICS.to_dict(registry=PLAYS))
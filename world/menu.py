@@ -2,26 +2,194 @@ from evennia.utils.evmenu import EvMenu, _HELP_NO_OPTION_MATCH, EvMenuGotoAbortM
 from evennia.utils.evmenu import EvMenuError, _HELP_NO_QUIT, _HELP_NO_OPTIONS
 from evennia.utils.ansi import strip_ansi
 from evennia.utils.utils import make_iter, is_iter
-import re
+from collections import OrderedDict
+from types import MappingProxyType
 from rich.table import Table
+from rich.segment import Segments
 from rich.box import ASCII2
 from rich.console import Group
 from rich.text import Text
 from rich.markup import escape
 
 
+class LayoutCache:
+    """
+    An LRU cache of pre-rendered Segments for menu parts that rarely change, such as option tables and
+    static help text. Widths are rounded down to a bucket so that clients with slightly different screen
+    sizes share entries.
+    """
+    bucket = 10
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+
+    def width_bucket(self, width: int) -> int:
+        return max(self.bucket, width - (width % self.bucket))
+
+    def get(self, key, console, build: callable, inset: int = 0):
+        """
+        Returns the cached render for key at the console's width, calling build() to create the renderable
+        on a miss. inset is subtracted from the width for blocks that will be drawn inside a bordered table.
+        """
+        width = self.width_bucket(console.width) - inset
+        full_key = (key, width)
+        if (found := self.data.get(full_key, None)) is not None:
+            self.data.move_to_end(full_key)
+            return Segments(found)
+        lines = console.render_lines(build(), console.options.update_width(width), new_lines=True)
+        found = [segment for line in lines for segment in line]
+        self.data[full_key] = found
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+        return Segments(found)
+
+    def clear(self):
+        self.data.clear()
+
+
+LAYOUT_CACHE = LayoutCache()
+
+# persistent Menus whose current node has not yet been written to their caller's Attributes.
+PENDING_SAVES = set()
+
+
+def flush_menus():
+    """
+    Writes the saved node of every persistent Menu with a pending change. Called on a timer by MenuSystem
+    and when the server stops.
+    """
+    for menu in list(PENDING_SAVES):
+        menu.flush_state()
+
+
+def caller_console(caller, session=None):
+    """
+    Returns the Rich console of the given session or the caller's first session, or None if there is none.
+    """
+    if session is None:
+        sessions = caller.sessions.all()
+        session = sessions[0] if sessions else None
+    return getattr(session, "console", None)
+
+
+def cached_render(caller, key, build: callable, session=None, inset: int = 0):
+    """
+    Renders a static block through LAYOUT_CACHE for the caller's screen width. Falls back to an uncached
+    build() if the caller has no console to render with.
+    """
+    if (console := caller_console(caller, session=session)) is None:
+        return build()
+    return LAYOUT_CACHE.get(key, console, build, inset=inset)
+
+
+_CMD_PREFIXES = frozenset("|@+$-")
+
+
+def _is_word(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+class MenuInput:
+    """
+    The tokenized form of a line of menu input, in the shape '<prefix><cmdname>[/switch...] <lsargs>=<rsargs>'.
+    group() mirrors re.Match so that goto callables can keep using caller.ndb._menu_match.group("args").
+    """
+    __slots__ = ("cmd", "prefix", "cmdname", "fullargs", "switches", "args", "lsargs", "rsargs")
+
+    def group(self, name: str):
+        return getattr(self, name)
+
+    @classmethod
+    def parse(cls, text: str):
+        """
+        Returns a MenuInput for text, or None if it does not begin with a command name.
+        """
+        length = len(text)
+        i = 0
+        while i < length and text[i] in _CMD_PREFIXES:
+            i += 1
+        start = i
+        while i < length and _is_word(text[i]):
+            i += 1
+        if i == start:
+            return None
+
+        out = cls()
+        out.prefix = text[:start] or None
+        out.cmdname = text[start:i]
+        out.cmd = text[:i]
+
+        rest_start = i
+        while i < length and text[i] == "/":
+            j = i + 1
+            while j < length and _is_word(text[j]):
+                j += 1
+            if j == i + 1:
+                break
+            i = j
+        out.switches = text[rest_start:i]
+
+        out.args = out.lsargs = out.rsargs = None
+        if i < length and text[i] == " ":
+            args = text[i:].lstrip(" ")
+            out.args = args
+            lsargs, sep, rsargs = args.partition("=")
+            out.lsargs = lsargs.strip() or None
+            out.rsargs = (rsargs.strip() or None) if sep else None
+            i = length
+        out.fullargs = text[rest_start:i]
+        return out
+
+
 class Menu(EvMenu):
-    re_cmd = re.compile(
-        r"^(?P<cmd>(?P<prefix>[\|@\+\$-]+)?(?P<cmdname>\w+))(?P<fullargs>(?P<switches>(?:\/\w+){0,})(?: +(?P<args>(?P<lsargs>[^=]+)?(?:=(?P<rsargs>.+)?)?)?)?)?",
-        flags=re.IGNORECASE | re.MULTILINE)
+    _pending_startnode = None
+    # how many compiled option tables each Menu keeps.
+    compiled_options_size = 32
+
+    def flush_state(self):
+        """
+        Writes the latest node of a persistent menu to the database, if it changed since the last flush.
+        """
+        PENDING_SAVES.discard(self)
+        if (state := self._pending_startnode) is None:
+            return
+        self._pending_startnode = None
+        self.caller.attributes.add("_menutree_saved_startnode", state)
+
+    def close_menu(self):
+        PENDING_SAVES.discard(self)
+        self._pending_startnode = None
+        super().close_menu()
 
     def display_helptext(self):
         print(type(self.nodetext))
         super().display_nodetext()
 
+    def layout_key(self):
+        """
+        Extra data that distinguishes cached layouts of the same node. The story editor's layouts differ by
+        the Template class of the character being edited.
+        """
+        if (target := self.caller.ndb.target):
+            return target.__class__
+        return None
+
     def options_formatter(self, optionlist):
         if not optionlist:
             return ""
+        signature = tuple((op.get("key", ""), op.get("desc", ""), op.get("syntax", ""),
+                           tuple(op.get("choices", list()))) for op in optionlist)
+        key = ("options", getattr(self, "_layout_nodename", None), self.layout_key(), signature, self.auto_quit)
+        try:
+            hash(key)
+        except TypeError:
+            # unhashable desc/syntax/choices; build without caching.
+            return self.build_options_table(optionlist)
+        return cached_render(self.caller, key, lambda: self.build_options_table(optionlist),
+                             session=self._session)
+
+    def build_options_table(self, optionlist):
         table = Table(safe_box=True, box=ASCII2)
         table.add_column("CMD", style="bold")
         table.add_column("Desc")
@@ -45,6 +213,62 @@ class Menu(EvMenu):
     def node_formatter(self, nodetext, optionstext):
         return Group(nodetext, optionstext)
 
+    def paging_session(self):
+        """
+        Returns the session with paged output waiting, if any, so 'more' still works while inside a menu.
+        """
+        sessions = [self._session] if self._session else self.caller.sessions.all()
+        for sess in sessions:
+            if getattr(sess, "pager", None):
+                return sess
+        return None
+
+    def compile_options(self, nodename, options):
+        """
+        Builds the lookup table for a node's options: a frozen mapping of normalized key to
+        (goto, goto_kwargs, execute, exec_kwargs), and the _default entry. The result is cached on this Menu,
+        keyed by node, layout_key() and the options' keys and callables, so redisplaying a node skips the work.
+        The cache only keeps the compiled_options_size most recently used tables.
+        """
+        if (cache := self.__dict__.get("_compiled_options", None)) is None:
+            cache = OrderedDict()
+            self._compiled_options = cache
+        signature = None
+        if options:
+            try:
+                signature = (nodename, self.layout_key(),
+                             tuple((tuple(make_iter(dic.get("key", ""))), dic.get("goto"), dic.get("exec"))
+                                   for dic in options))
+                if (found := cache.get(signature, None)):
+                    cache.move_to_end(signature)
+                    return found
+            except TypeError:
+                # unhashable goto/exec kwargs; compile without caching.
+                signature = None
+
+        lookup = dict()
+        default = None
+        if options:
+            for inum, dic in enumerate(options):
+                keys = make_iter(dic.get("key"))
+                goto, goto_kwargs, execute, exec_kwargs = self.extract_goto_exec(nodename, dic)
+                if "_default" in keys:
+                    keys = [key for key in keys if key != "_default"]
+                    default = (goto, goto_kwargs, execute, exec_kwargs)
+                else:
+                    # use the key (only) if set, otherwise use the running number
+                    keys = list(make_iter(dic.get("key", str(inum + 1).strip())))
+                if goto or execute:
+                    for key in keys:
+                        lookup[strip_ansi(key).strip().lower()] = (goto, goto_kwargs, execute, exec_kwargs)
+
+        compiled = (MappingProxyType(lookup), default)
+        if signature is not None:
+            cache[signature] = compiled
+            if len(cache) > self.compiled_options_size:
+                cache.popitem(last=False)
+        return compiled
+
     def parse_input(self, raw_string):
         """
         Parses the incoming string from the menu user.
@@ -57,10 +281,10 @@ class Menu(EvMenu):
             should also report errors directly to the user.
         """
         stripped = strip_ansi(raw_string.strip())
-        if not (match := self.re_cmd.match(stripped)):
+        if not (match := MenuInput.parse(stripped)):
             self.msg(_HELP_NO_OPTION_MATCH)
             return
-        cmd = match.group("cmd").lower()
+        cmd = match.cmd.lower()
         self.caller.ndb._menu_match = match
 
         try:
@@ -69,6 +293,8 @@ class Menu(EvMenu):
                 # below
                 goto, goto_kwargs, execfunc, exec_kwargs = self.options[cmd]
                 self.run_exec_then_goto(execfunc, goto, raw_string, exec_kwargs, goto_kwargs)
+            elif cmd in ("more", "next") and (session := self.paging_session()):
+                session.page_next()
             elif self.auto_look and cmd in ("look", "l"):
                 self.display_nodetext()
             elif self.auto_help and cmd in ("help", "h"):
@@ -121,9 +347,9 @@ class Menu(EvMenu):
             return
 
         if self._persistent:
-            self.caller.attributes.add(
-                "_menutree_saved_startnode", (nodename, (raw_string, kwargs))
-            )
+            # coalesced; flush_state() writes only the latest node.
+            self._pending_startnode = (nodename, (raw_string, kwargs))
+            PENDING_SAVES.add(self)
 
         # validation of the node return values
         helptext = ""
@@ -135,35 +361,9 @@ class Menu(EvMenu):
         nodetext = "" if nodetext is None else nodetext
         options = [options] if isinstance(options, dict) else options
 
-        # this will be displayed in the given order
-        display_options = []
-        # this is used for lookup
-        self.options = {}
-        self.default = None
-        if options:
-            for inum, dic in enumerate(options):
-                # fix up the option dicts
-                keys = make_iter(dic.get("key"))
-                desc = dic.get("desc", dic.get("text", None))
-                if "_default" in keys:
-                    keys = [key for key in keys if key != "_default"]
-                    goto, goto_kwargs, execute, exec_kwargs = self.extract_goto_exec(nodename, dic)
-                    self.default = (goto, goto_kwargs, execute, exec_kwargs)
-                else:
-                    # use the key (only) if set, otherwise use the running number
-                    keys = list(make_iter(dic.get("key", str(inum + 1).strip())))
-                    goto, goto_kwargs, execute, exec_kwargs = self.extract_goto_exec(nodename, dic)
-                if keys:
-                    display_options.append((keys[0], desc))
-                    for key in keys:
-                        if goto or execute:
-                            self.options[strip_ansi(key).strip().lower()] = (
-                                goto,
-                                goto_kwargs,
-                                execute,
-                                exec_kwargs,
-                            )
+        self.options, self.default = self.compile_options(nodename, options)
 
+        self._layout_nodename = nodename
         self.nodetext = self._format_node(nodetext, options)
         self.node_kwargs = kwargs
         self.nodename = nodename
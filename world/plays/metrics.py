@@ -0,0 +1,105 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+
+class Histogram:
+    """
+    Counts observations into fixed buckets, each counting values up to and including its bound, plus an
+    overflow bucket. Also keeps the count, sum and largest value seen.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.buckets)}
+        buckets["+Inf"] = self.buckets[-1]
+        return {"count": self.count, "sum": self.total, "mean": self.mean, "max": self.max, "buckets": buckets}
+
+
+# seconds
+_DURATION_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+_IDLE_BOUNDS = (1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class PlayMetrics:
+    """
+    Counters and histograms describing the Play lifecycle in this process. Read by the +plays command and
+    the web API; nothing here is persisted, so everything starts from zero when the server starts.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters = {
+            "plays_created": 0,
+            "plays_terminated": 0,
+            "timeouts": 0,
+            "sessions_added": 0,
+            "sessions_removed": 0,
+            "tick_overruns": 0,
+            # Play output discarded because a Session's OutputQueue was full.
+            "output_dropped": 0,
+        }
+        self.histograms = {
+            "deploy_character": Histogram(_DURATION_BOUNDS),
+            "extract_character": Histogram(_DURATION_BOUNDS),
+            "tick": Histogram(_DURATION_BOUNDS),
+            # How long Plays spent without Sessions, ending in either a reconnect or a timeout.
+            "idle": Histogram(_IDLE_BOUNDS),
+        }
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def observe(self, name: str, value: float):
+        self.histograms[name].observe(value)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """
+        Decorator that records each call's duration in the named histogram.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def to_dict(self, registry=None) -> dict:
+        out = {"uptime": time.time() - self.started,
+               "counters": dict(self.counters),
+               "histograms": {k: v.to_dict() for k, v in self.histograms.items()}}
+        if registry is not None:
+            out["gauges"] = {"plays": len(registry),
+                             "sessionless": len(registry.sessionless),
+                             "pending_timeouts": len(registry.timeouts)}
+        return out
+
+
+METRICS = PlayMetrics()
@@ -1,9 +1,13 @@
 import time
+from collections import defaultdict, deque
 from django.conf import settings
+from django.db import transaction
 from evennia.typeclasses.models import TypeclassBase
 from twisted.internet.defer import inlineCallbacks, returnValue
-from twisted.internet import reactor, task
+from twisted.internet import reactor
 from world.plays.models import PlayDB
+from world.plays.registry import PLAYS
+from world.plays.metrics import METRICS
 from evennia.objects.objects import ObjectSessionHandler, _SESSID_MAX
 from evennia.utils.utils import lazy_property, class_from_module, make_iter, to_str, logger
 
@@ -14,6 +18,10 @@ _CMDHANDLER = None
 
 
 class PlaySessionHandler(ObjectSessionHandler):
+    """
+    Session membership is kept in memory. db_sessid is updated on the Play but only written to the
+    database by PLAYS.flush(), which runs on the heartbeat interval and when the server stops.
+    """
 
     def _recache(self):
         global _SESSIONS
@@ -22,8 +30,7 @@ class PlaySessionHandler(ObjectSessionHandler):
         self._sessid_cache = list(dict.fromkeys(sess for sess in self.obj.db_sessid if sess in _SESSIONS))
         if len(self._sessid_cache) != len(self.obj.db_sessid):
             # cache is out of sync with sessionhandler! Only retain the ones in the handler.
-            self.obj.db_sessid = self._sessid_cache
-            self.obj.save(update_fields=["db_sessid"])
+            self.obj.db_sessid = list(self._sessid_cache)
 
     def add(self, session):
         global _SESSIONS
@@ -39,28 +46,162 @@ class PlaySessionHandler(ObjectSessionHandler):
             if len(sessid_cache) >= _SESSID_MAX:
                 return
             sessid_cache.append(sessid)
-            self.obj.db_sessid = sessid_cache
-            self.obj.save(update_fields=["db_sessid"])
+            self.obj.db_sessid = list(sessid_cache)
+
+    def remove(self, session):
+        try:
+            sessid = session.sessid
+        except AttributeError:
+            sessid = session
+
+        if sessid in self._sessid_cache:
+            self._sessid_cache.remove(sessid)
+            self.obj.db_sessid = list(self._sessid_cache)
+
+    def clear(self):
+        self._sessid_cache = list()
+        self.obj.db_sessid = list()
+
+
+class OutputQueue:
+    """
+    Output waiting to be sent to one Session. Each queue drains in its own reactor callbacks, a batch at
+    a time, so one backlogged Session can't hold up the others. When the queue is full the oldest output
+    is dropped; drops are counted in METRICS and the player is told before the next output goes out.
+    Prompts follow PLAY_PROMPT_POLICY: "merge" keeps only the newest prompt and sends it once everything
+    queued ahead of it is out, "drop" discards a prompt if other output is still waiting.
+
+    Anything sent to the Session directly flushes the queue first, so it can't overtake queued output.
+    """
+
+    def __init__(self, session, clock=reactor):
+        self.session = session
+        self.clock = clock
+        self.items = deque()
+        self.prompt = None
+        # output dropped since the player was last told.
+        self.dropped = 0
+        self.timer = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def put(self, kwargs: dict):
+        if "prompt" in kwargs and not set(kwargs) - {"prompt", "options"}:
+            if settings.PLAY_PROMPT_POLICY == "merge":
+                self.prompt = kwargs
+                self.schedule()
+                return
+            if self.items:
+                return
+        if len(self.items) >= settings.PLAY_OUTPUT_QUEUE_SIZE:
+            self.items.popleft()
+            self.dropped += 1
+            METRICS.count("output_dropped")
+        self.items.append(kwargs)
+        self.schedule()
+
+    def schedule(self):
+        if self.timer is None:
+            self.timer = self.clock.callLater(0, self.drain)
+
+    def send(self, kwargs: dict):
+        try:
+            self.session.send_data(**kwargs)
+        except Exception:
+            logger.log_trace()
+
+    def report_dropped(self):
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            self.send({"text": f"[{dropped} earlier message{'s' if dropped != 1 else ''} dropped because "
+                               f"output was arriving faster than it could be sent.]"})
+
+    def drain(self):
+        self.timer = None
+        self.report_dropped()
+        for i in range(min(settings.PLAY_OUTPUT_BATCH, len(self.items))):
+            self.send(self.items.popleft())
+        if self.items:
+            self.schedule()
+        elif self.prompt:
+            prompt, self.prompt = self.prompt, None
+            self.send(prompt)
+
+    def flush(self):
+        """
+        Sends everything queued right away. A merged prompt stays pending and follows on the next drain.
+        """
+        if not self.items and not self.dropped:
+            return
+        items, self.items = self.items, deque()
+        self.report_dropped()
+        for kwargs in items:
+            self.send(kwargs)
+        if self.prompt is None and self.timer is not None:
+            if self.timer.active():
+                self.timer.cancel()
+            self.timer = None
+
+
+class PromptScheduler:
+    """
+    Collects Plays that were sent text and prints all of their prompts in one reactor callback, instead of
+    every Play keeping its own timer. A Play marked several times before the flush gets one prompt.
+    """
+    delay = 0.1
+
+    def __init__(self, clock=reactor):
+        self.clock = clock
+        # play pk -> Play
+        self.pending = dict()
+        self.timer = None
+
+    def mark(self, play):
+        self.pending[play.pk] = play
+        if self.timer is None:
+            self.timer = self.clock.callLater(self.delay, self.flush)
+
+    def flush(self):
+        self.timer = None
+        pending, self.pending = self.pending, dict()
+        for play in pending.values():
+            try:
+                play.prompt.print()
+            except Exception:
+                logger.log_trace()
+
+
+PROMPTS = PromptScheduler()
 
 
 class PromptHandler:
+    """
+    Renders a Play's prompt from its puppet and caches the result until invalidate() is called, which the
+    puppet does whenever something its prompt shows changes.
+    """
 
     def __init__(self, owner):
         self.owner = owner
-        self.task = None
+        self.cached = None
+        self.cached_for = None
 
     def prepare(self):
-        if self.task:
-            self.task.cancel()
-        self.task = task.deferLater(reactor, 0.1, self.print)
-        self.task.addErrback(self.error)
+        PROMPTS.mark(self.owner)
 
-    def print(self):
-        if self.owner.puppet:
-            self.owner.msg(prompt=f"\n{self.owner.puppet.prompt.render()}\n")
+    def invalidate(self):
+        self.cached_for = None
 
-    def error(self, err):
-        pass
+    def render(self):
+        puppet = self.owner.puppet
+        if self.cached_for != puppet.pk:
+            self.cached = puppet.render_prompt()
+            self.cached_for = puppet.pk
+        return self.cached
+
+    def print(self):
+        if self.owner.puppet and (text := self.render()):
+            self.owner.msg(prompt=f"\n{text}\n")
 
 
 class DefaultPlay(PlayDB, metaclass=TypeclassBase):
@@ -77,6 +218,9 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
         new_play = cls(id=character, db_puppet=character, db_account=account)
         new_play.save()
         character.account = account
+        # the caller attaches the first Session straight away, so the Play never starts out idle.
+        PLAYS.add(new_play, sessionless=False)
+        METRICS.count("plays_created")
         return new_play
 
     def at_first_save(self):
@@ -137,6 +281,7 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
         raw_string = self.id.nicks.nickreplace(
             raw_string, categories=("inputline", "channel"), include_account=True
         )
+        PLAYS.touch(self)
         handler = _CMDHANDLER(session or self, raw_string, **kwargs)
         return handler.execute()
 
@@ -151,11 +296,17 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
         if text:
             kwargs["text"] = text
             self.prompt.prepare()
-        if session:
-            session.data_out(**kwargs)
-        else:
-            for sess in self.sessions.all():
-                sess.data_out(**kwargs)
+        # Rich renderables are laid out once per distinct client (width and color system), not per Session.
+        rendered = dict()
+        for sess in make_iter(session) if session else self.sessions.all():
+            sess.output.put(self.render_for(sess, kwargs, rendered))
+
+    def render_for(self, session, kwargs: dict, rendered: dict) -> dict:
+        if kwargs.get("paged", False) or not hasattr(text := kwargs.get("text", None), "__rich_console__"):
+            return kwargs
+        if (key := session.render_key()) not in rendered:
+            rendered[key] = session.print(text)
+        return {**kwargs, "text": rendered[key]}
 
     @property
     def idle_time(self):
@@ -185,15 +336,21 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
         session.puid = self.id.id
         session.play = self
         self.sessions.add(session)
+        PLAYS.session_added(self)
+        METRICS.count("sessions_added")
         session.puppet = self.puppet
         self.puppet.sessions.add(session)
 
     def remove_session(self, session):
+        if (menu := self.puppet.ndb._evmenu) and hasattr(menu, "flush_state"):
+            menu.flush_state()
         session.puid = None
         session.puppet = None
         session.play = None
         self.puppet.sessions.remove(session)
         self.sessions.remove(session)
+        PLAYS.session_removed(self)
+        METRICS.count("sessions_removed")
 
     def on_additional_session(self, session):
         pass
@@ -201,6 +358,7 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
     def on_first_session(self, session):
         pass
 
+    @METRICS.timed("deploy_character")
     def deploy_character(self):
         c = self.id
         if c.location is not None:
@@ -225,9 +383,12 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
     def possess(self, obj, msg=None):
         if msg is None:
             msg = f"You become {obj.get_display_name(looker=self.id)}"
+        old_puppet_id = self.db_puppet_id
         self.puppet = obj
+        PLAYS.puppet_changed(self, old_puppet_id)
         self.msg(msg)
         self.puppet.at_possess(self)
+        self.warm_cmdsets()
 
     def is_possessing(self):
         return self.id != self.db_puppet
@@ -236,12 +397,43 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
         puppet = self.puppet
         self.msg(text=f"You stop possessing {puppet.get_display_name(looker=self.id)} and return to being {self.id.get_display_name(looker=self.id)}")
         self.puppet = self.id
+        PLAYS.puppet_changed(self, puppet.pk)
         puppet.at_unpossess(self)
+        self.warm_cmdsets()
+
+    # How many puppets' merged cmdsets stay pinned: the current one and the one before it.
+    pinned_cmdset_count = 2
+
+    def warm_cmdsets(self):
+        """
+        Merges the cmdsets the next command from each Session will use for the current puppet, so the first
+        command after a possession switch finds them in the cmdhandler's merge cache. That cache only holds
+        weak references, so the results are pinned here, along with the previous puppet's, making a switch
+        back just as fast.
+        """
+        from commands.cmdhandler import get_and_merge_cmdsets
+
+        if not (sessions := self.sessions.all()):
+            return
+        pinned = self.ndb.pinned_cmdsets or dict()
+        # held until the merges below finish, so an earlier result for this puppet can be reused.
+        previous = pinned.pop(self.db_puppet_id, None)
+        merged = pinned[self.db_puppet_id] = list()
+        while len(pinned) > self.pinned_cmdset_count:
+            del pinned[next(iter(pinned))]
+        self.ndb.pinned_cmdsets = pinned
+
+        for session in sessions:
+            call_chain = sorted(session.get_cmd_objects().values(), key=lambda x: x.cmd_objects_sort_priority)
+            deferred = get_and_merge_cmdsets(call_chain, "session", "")
+            deferred.addCallback(lambda cmdset: merged.append(cmdset) if cmdset else None)
+            deferred.addErrback(lambda err: logger.log_err(f"Could not prepare cmdsets for {self}: {err}"))
 
     def cleanup_misc(self):
         if self.is_possessing():
             self.unposess()
 
+    @METRICS.timed("extract_character")
     def extract_character(self):
         if self.id.location:
             location = self.id.location
@@ -260,8 +452,92 @@ class DefaultPlay(PlayDB, metaclass=TypeclassBase):
         if (sessions := self.sessions.all()):
             for sess in sessions:
                 self.remove_session(sess)
+        PLAYS.remove(self)
+        METRICS.count("plays_terminated")
         self.delete()
 
+    @classmethod
+    def terminate_many(cls, plays):
+        """
+        Ends many Plays at once, as on a cold start or stop. Does what terminate_play() does for each, but
+        stores every character's prelogout_location and clears their locations in a few bulk queries,
+        deletes all of the Plays with one query, and only announces departures in rooms where someone who
+        is still connected can hear them.
+        """
+        from evennia.objects.models import ObjectDB
+        from evennia.typeclasses.attributes import Attribute
+
+        if not (plays := list(plays)):
+            return
+
+        # location -> [characters leaving it]
+        leaving = defaultdict(list)
+        for play in plays:
+            if play.is_possessing():
+                play.puppet.at_unpossess(play)
+            for sess in play.sessions.all():
+                play.remove_session(sess)
+            play.update_stats()
+            if (location := play.id.location):
+                leaving[location].append(play.id)
+            PLAYS.remove(play)
+
+        for location, characters in leaving.items():
+            if any(getattr(obj, "is_connected", False) for obj in location.contents if obj not in characters):
+                for character in characters:
+                    location.msg_contents(text="$You() $conj(leaves) the game.", from_obj=character)
+            for character in characters:
+                location.at_object_leave(character, None)
+
+        characters = [character for found in leaving.values() for character in found]
+        pks = [play.pk for play in plays]
+        with transaction.atomic():
+            cls.store_prelogout_locations(leaving)
+            ObjectDB.objects.filter(pk__in=[c.pk for c in characters]).update(db_location=None)
+            # What TypedObject.delete() would clear: the Plays' own Attributes and nicks. Their Tag links go
+            # with the PlayDB rows; Tags themselves are shared and are left alone, as clear() does.
+            Attribute.objects.filter(playdb__in=pks).delete()
+            PlayDB.objects.filter(pk__in=pks).delete()
+        METRICS.count("plays_terminated", len(plays))
+
+        for location, found in leaving.items():
+            for character in found:
+                location.contents_cache.remove(character)
+                character.db_location = None
+                character.attributes.reset_cache()
+        for play in plays:
+            play.flush_from_cache(force=True)
+
+    @staticmethod
+    def store_prelogout_locations(leaving: dict):
+        """
+        Replaces the prelogout_location Attribute of every character in leaving (location -> [characters])
+        with one delete and two bulk inserts. The rows are filled in as AttributeHandler.add() would, since the
+        handler only loads Attributes whose db_model matches. Callers must reset the characters' Attribute
+        caches afterwards.
+        """
+        from evennia.objects.models import ObjectDB
+        from evennia.typeclasses.attributes import Attribute
+        from evennia.utils.dbserialize import to_pickle
+
+        if not (pairs := [(c, location) for location, found in leaving.items() for c in found]):
+            return
+        Attribute.objects.filter(objectdb__in=[c for c, location in pairs], db_key="prelogout_location",
+                                 db_category__isnull=True, db_model="objectdb", db_attrtype__isnull=True).delete()
+        attrs = Attribute.objects.bulk_create([Attribute(db_key="prelogout_location", db_value=to_pickle(location),
+                                                         db_category=None, db_model="objectdb", db_attrtype=None)
+                                               for c, location in pairs])
+        through = ObjectDB.db_attributes.through
+        through.objects.bulk_create([through(objectdb_id=c.pk, attribute_id=attr.pk)
+                                     for (c, location), attr in zip(pairs, attrs)])
+
+    def at_timeout(self):
+        """
+        Called when the Play has gone PLAY_TIMEOUT_SECONDS without any Sessions. Ends the Play.
+        """
+        METRICS.count("timeouts")
+        self.terminate_play()
+
     def at_server_cold_stop(self):
         """
         If this is a cold stop, then all Plays must be force-terminated.
@@ -0,0 +1,216 @@
+import heapq
+import time
+from collections import defaultdict
+from django.conf import settings
+from twisted.internet import reactor
+from evennia.utils import logger
+from world.plays.models import PlayDB
+from world.utils import utcnow
+from world.plays.metrics import METRICS
+
+
+class TimeoutScheduler:
+    """
+    Deadlines for Plays that have no Sessions. Deadlines are kept in a heap, and a single reactor timer is
+    armed for the earliest one. Cancelling only forgets the Play's deadline; its stale heap entry is skipped
+    when it reaches the top. When nothing is timing out, no timer is armed at all.
+    """
+
+    def __init__(self, clock=reactor):
+        self.clock = clock
+        # [(deadline, play pk)], may hold stale entries.
+        self.heap = list()
+        # play pk -> (deadline, Play). The only live deadlines.
+        self.deadlines = dict()
+        self.timer = None
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def schedule(self, play, delay: float):
+        deadline = self.clock.seconds() + delay
+        self.deadlines[play.pk] = (deadline, play)
+        heapq.heappush(self.heap, (deadline, play.pk))
+        if len(self.heap) > 2 * len(self.deadlines) + 64:
+            self.heap = [(deadline, pk) for pk, (deadline, play) in self.deadlines.items()]
+            heapq.heapify(self.heap)
+        self.arm()
+
+    def cancel(self, play):
+        self.deadlines.pop(play.pk, None)
+
+    def clear(self):
+        self.heap.clear()
+        self.deadlines.clear()
+        if self.timer and self.timer.active():
+            self.timer.cancel()
+        self.timer = None
+
+    def is_live(self, entry) -> bool:
+        found = self.deadlines.get(entry[1], None)
+        return found is not None and found[0] == entry[0]
+
+    def arm(self):
+        heap = self.heap
+        while heap and not self.is_live(heap[0]):
+            heapq.heappop(heap)
+        active = self.timer is not None and self.timer.active()
+        if not heap:
+            if active:
+                self.timer.cancel()
+            self.timer = None
+            return
+        deadline = heap[0][0]
+        if active:
+            if self.timer.getTime() <= deadline:
+                return
+            self.timer.cancel()
+        self.timer = self.clock.callLater(max(0.0, deadline - self.clock.seconds()), self.expire)
+
+    def expire(self):
+        self.timer = None
+        now = self.clock.seconds()
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if not self.is_live(entry):
+                continue
+            deadline, play = self.deadlines.pop(entry[1])
+            try:
+                play.at_timeout()
+            except Exception:
+                logger.log_trace()
+        self.arm()
+
+
+class PlayRegistry:
+    """
+    Every Play running in this process, keyed by the id of its character. DefaultPlay keeps it current as
+    Plays are created, gain or lose Sessions, and are terminated, so nothing needs to query PlayDB to find
+    them. It is rebuilt from the database when the server starts.
+    """
+
+    def __init__(self):
+        # character id -> Play
+        self.plays = dict()
+        # id of the object each Play is currently puppeting -> Play
+        self.puppets = dict()
+        # character id -> Play, for Plays with no Sessions attached.
+        self.sessionless = dict()
+        self.timeouts = TimeoutScheduler()
+        # character id -> time.monotonic() when the Play lost its last Session.
+        self.idle_since = dict()
+
+    def __len__(self):
+        return len(self.plays)
+
+    def __contains__(self, play):
+        return play.pk in self.plays
+
+    def get(self, character_id: int):
+        return self.plays.get(character_id, None)
+
+    def puppeteer(self, object_id: int):
+        return self.puppets.get(object_id, None)
+
+    def all(self) -> list:
+        return list(self.plays.values())
+
+    def add(self, play, sessionless: bool = None):
+        """
+        Registers a Play. Unless told otherwise, a Play with no Session ids is marked sessionless and starts
+        timing out.
+        """
+        self.plays[play.pk] = play
+        self.puppets[play.db_puppet_id] = play
+        if sessionless is None:
+            sessionless = not play.db_sessid
+        if sessionless:
+            self.mark_sessionless(play)
+
+    def remove(self, play):
+        self.plays.pop(play.pk, None)
+        if self.puppets.get(play.db_puppet_id, None) is play:
+            del self.puppets[play.db_puppet_id]
+        self.sessionless.pop(play.pk, None)
+        self.timeouts.cancel(play)
+        self.end_idle(play)
+
+    def puppet_changed(self, play, old_puppet_id: int):
+        if self.puppets.get(old_puppet_id, None) is play:
+            del self.puppets[old_puppet_id]
+        self.puppets[play.db_puppet_id] = play
+
+    def mark_sessionless(self, play):
+        self.sessionless[play.pk] = play
+        self.idle_since[play.pk] = time.monotonic()
+        self.timeouts.schedule(play, settings.PLAY_TIMEOUT_SECONDS)
+
+    def end_idle(self, play):
+        if (since := self.idle_since.pop(play.pk, None)) is not None:
+            METRICS.observe("idle", time.monotonic() - since)
+
+    def session_added(self, play):
+        if self.sessionless.pop(play.pk, None) is not None:
+            self.timeouts.cancel(play)
+            self.end_idle(play)
+
+    def session_removed(self, play):
+        if play.pk in self.plays and not play.sessions.count():
+            self.mark_sessionless(play)
+
+    def touch(self, play):
+        """
+        Records activity on a Play. Only kept in memory until the next flush().
+        """
+        play.db_last_activity = utcnow()
+
+    def flush(self, now=None):
+        """
+        Writes every Play's heartbeat, last activity and Session ids in one bulk_update.
+        """
+        if not (plays := self.all()):
+            return
+        now = now or utcnow()
+        for play in plays:
+            play.db_last_good = now
+        PlayDB.objects.bulk_update(plays, ["db_last_good", "db_last_activity", "db_sessid"])
+
+    def reattach(self, sessions):
+        """
+        Reattaches Sessions to the Plays named by their puid after a server reload, in one pass. Plays not
+        yet in the registry are loaded with a single query, and no Session ids are written until the next
+        flush(). Sessions whose Play no longer exists are cleared.
+        """
+        by_play = defaultdict(list)
+        for session in sessions:
+            by_play[session.puid].append(session)
+        if (missing := [pk for pk in by_play if pk not in self.plays]):
+            for play in PlayDB.objects.filter(pk__in=missing):
+                self.add(play)
+        for pk, found in by_play.items():
+            if (play := self.plays.get(pk, None)) is None:
+                for session in found:
+                    session.puid = None
+                continue
+            for session in found:
+                play.add_session(session)
+
+    def rebuild(self, plays):
+        """
+        Replaces the registry's contents with the given Plays. Used on server start, which may run before
+        or after Sessions resync. Plays with no Sessions attached yet start timing out, and stop again as
+        Sessions reattach.
+        """
+        self.timeouts.clear()
+        self.plays = dict()
+        self.puppets = dict()
+        self.sessionless = dict()
+        self.idle_since = dict()
+        for play in plays:
+            self.plays[play.pk] = play
+            self.puppets[play.db_puppet_id] = play
+            if not play.sessions.count():
+                self.mark_sessionless(play)
+
+
+PLAYS = PlayRegistry()
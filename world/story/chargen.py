@@ -0,0 +1,166 @@
+from collections import defaultdict
+from world.story.stats import ATTRIBUTES, ABILITIES, AttributeHandler, _DerivedAbility
+
+_ATTRIBUTE_GROUPS = dict()
+for _group, _names in (("Physical", AttributeHandler.physical_attributes),
+                       ("Social", AttributeHandler.social_attributes),
+                       ("Mental", AttributeHandler.mental_attributes)):
+    for _name in _names:
+        _ATTRIBUTE_GROUPS[_name] = _group
+
+# Abilities whose Caste/Favored status is inherited from another Ability.
+_DERIVED_FLAGS = {"Martial Arts": "Brawl"}
+
+# Abilities whose rating is the highest in another category, such as Craft from Crafts.
+_DERIVED_VALUES = {str(a): a.check_path for a in ABILITIES if issubclass(a, _DerivedAbility)}
+
+
+class Budget:
+
+    def __init__(self, name: str, label: str, allowed: int, category: str):
+        self.name = name
+        self.label = label
+        self.category = category
+        self.allowed = allowed
+        self.spent = 0
+
+    def __str__(self):
+        return f"{self.spent}/{self.allowed} {self.label}"
+
+    @property
+    def over(self) -> bool:
+        return self.spent > self.allowed
+
+    @property
+    def remaining(self) -> int:
+        return self.allowed - self.spent
+
+
+class ChargenResult:
+    """
+    Everything a ChargenValidator found. budgets holds a Budget for every template allowance that is
+    non-zero, details holds breakdowns such as dots per Attribute group, and errors lists rule violations
+    by category (attributes, abilities, powers, template).
+    """
+
+    def __init__(self):
+        self.budgets = dict()
+        self.details = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(list)
+
+    def error(self, category: str, message: str):
+        self.errors[category].append(message)
+
+    def all_errors(self) -> list:
+        return [err for errors in self.errors.values() for err in errors]
+
+    def spend(self, name: str, amount: int = 1):
+        if (budget := self.budgets.get(name, None)):
+            budget.spent += amount
+
+    def spent(self, name: str) -> int:
+        if (budget := self.budgets.get(name, None)):
+            return budget.spent
+        return 0
+
+    @property
+    def valid(self) -> bool:
+        return not self.all_errors()
+
+    @property
+    def complete(self) -> bool:
+        return self.valid and all(not b.remaining for b in self.budgets.values())
+
+
+class ChargenValidator:
+    """
+    Checks a character against its template's chargen allowances in a single pass over its stat snapshot.
+    """
+
+    def __init__(self, target, snapshot=None):
+        self.target = target
+        self.snapshot = snapshot if snapshot is not None else target.story_snapshot.get()
+
+    def labels(self) -> dict:
+        t = self.target
+        return {
+            "caste_attributes": (f"{t.sub_name} Attributes", "attributes"),
+            "favored_attributes": ("Favored Attributes", "attributes"),
+            "supernal_attributes": (f"{t.supernal_attribute_name} Attributes", "attributes"),
+            "dots_attributes": ("Attribute Dots", "attributes"),
+            "caste_abilities": (f"{t.sub_name} Abilities", "abilities"),
+            "favored_abilities": ("Favored Abilities", "abilities"),
+            "supernal_abilities": (f"{t.supernal_ability_name} Abilities", "abilities"),
+            "dots_abilities": ("Ability Dots", "abilities"),
+            "dots_specialties": ("Specialty Dots", "abilities"),
+            "starting_charms": ("starting Charms/Spells/Evocations", "powers")
+        }
+
+    def validate(self) -> ChargenResult:
+        t = self.target
+        snapshot = self.snapshot
+        result = ChargenResult()
+
+        for name, (label, category) in self.labels().items():
+            if (allowed := getattr(t, name, 0)):
+                result.budgets[name] = Budget(name, label, allowed, category)
+
+        for attr in ATTRIBUTES:
+            name = str(attr)
+            row = snapshot.get("Attributes", name)
+            dots = (row.value if row is not None else attr.default_value) - attr.min_value
+            result.spend("dots_attributes", dots)
+            result.details["attributes"][_ATTRIBUTE_GROUPS[name]] += dots
+            if row is not None:
+                self.check_flags(result, row, "Attribute", "attributes", t.sub_attributes)
+
+        abilities = snapshot.stats["Abilities"]
+        for name, row in abilities.items():
+            result.spend("dots_abilities", row.value)
+            self.check_flags(result, row, "Ability", "abilities", t.sub_abilities,
+                             inherits=abilities.get(_DERIVED_FLAGS.get(name, None), None))
+            if (check_path := _DERIVED_VALUES.get(name, None)):
+                value = snapshot.max_value(check_path, default=row.value)
+            else:
+                value = row.value
+            if t.favored_requires_dots and row.flag_1 == 1 and not value:
+                result.error("abilities", f"Favored Ability {name} must have at least one dot!")
+
+        for category in ("Crafts", "Styles"):
+            for row in snapshot.stats[category].values():
+                result.spend("dots_abilities", row.value)
+                result.details["abilities"][category] += row.value
+
+        # Only Abilities take specialties, so Attribute rows never count against the allowance.
+        for stat, name, value in snapshot.all_specialties(categories=("Abilities",)):
+            result.spend("dots_specialties", value)
+
+        for root in ("Charms", "Spells", "Evocations"):
+            result.spend("starting_charms", snapshot.power_count(root))
+
+        for budget in result.budgets.values():
+            if budget.over:
+                result.error(budget.category, f"Too many {budget.label}: {budget}")
+
+        fields = t.get_extra_fields() if t.extra_fields else dict()
+        for k, v in t.extra_fields.items():
+            if v is True and not fields.get(k, None):
+                result.error("template", f"{k} is a required field.")
+
+        return result
+
+    def check_flags(self, result, row, stat_type: str, kind: str, choices: list, inherits=None):
+        t = self.target
+        name = row.stat.name
+        if row.flag_1 == 1:
+            result.spend(f"favored_{kind}")
+        elif row.flag_1 == 2:
+            result.spend(f"caste_{kind}")
+            if f"caste_{kind}" in result.budgets and name not in choices:
+                result.error(kind, f"{name} cannot be a {t.sub_name} {stat_type}.")
+        if row.flag_2 == 1:
+            result.spend(f"supernal_{kind}")
+            is_caste = row.flag_1 == 2 or (inherits is not None and inherits.flag_1 == 2)
+            if not is_caste:
+                supernal_name = getattr(t, f"supernal_{stat_type.lower()}_name", None) or "Supernal"
+                result.error(kind, f"{name} must be a {t.sub_name} {stat_type} to be {supernal_name}.")
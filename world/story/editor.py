@@ -8,28 +8,89 @@ from rich.markup import escape
 from rich.box import ASCII2
 from rich.columns import Columns
 from world.story.powers import CHARM_CATEGORIES, SPELL_CATEGORIES
+from world.menu import cached_render
+from world.story.chargen import ChargenValidator
 
 _INFLECT = inflect.engine()
 
 _nodes = ["template", "attributes", "abilities", "merits", "powers", "miscellaneous"]
 
 
+# width taken up by _table()'s borders and padding.
+_TABLE_INSET = 4
+
+
 def _table() -> Table:
     table = Table(safe_box=True, box=ASCII2, show_header=False, expand=True)
     table.add_column()
     return table
 
 
+def _lines(lines: list) -> Group:
+    return Group(*[escape(t) if isinstance(t, str) else t for t in lines])
+
+
+def _changed(caller, *categories):
+    """
+    Marks categories of the target's data as changed, dropping every cached section that depends on them.
+    Goto callbacks call this only after a successful write, so failed or invalid input redraws from cache.
+    Also records the target's snapshot version, since the write just changed it.
+    """
+    sections = caller.ndb._editor_sections or dict()
+    categories = set(categories)
+    caller.ndb._editor_sections = {k: v for k, v in sections.items() if not v[0] & categories}
+    caller.ndb._editor_version = caller.ndb.target.story_snapshot.version
+
+
+def _section(caller, name: str, depends: tuple, build: callable):
+    """
+    Returns the cached render of a node section, calling build() only if one of the categories it depends
+    on has changed since it was last built. Every section depends on the target's template. If the target
+    was changed outside the editor, such as by a staff command or a template reset, its snapshot version
+    will have moved on without _changed() being called, and every section is rebuilt.
+    """
+    version = caller.ndb.target.story_snapshot.version
+    if (sections := caller.ndb._editor_sections) is None or caller.ndb._editor_version != version:
+        sections = dict()
+        caller.ndb._editor_sections = sections
+        caller.ndb._editor_version = version
+    key = (caller.ndb.target.id, name, bool(caller.ndb.chargen))
+    if (found := sections.get(key, None)) is None:
+        found = ({"template", *depends}, build())
+        sections[key] = found
+    return found[1]
+
+
+def _chargen(caller, target, snapshot=None):
+    """
+    Returns the ChargenResult for the target, validating it at most once per snapshot version. Every budget
+    section reads from the same result instead of running its own validation.
+    """
+    key = (target.id, target.story_snapshot.version)
+    if (found := caller.ndb._editor_chargen) is None or found[0] != key:
+        found = (key, ChargenValidator(target, snapshot=snapshot).validate())
+        caller.ndb._editor_chargen = found
+    return found[1]
+
+
+def _static(caller, key, lines: list):
+    """
+    Renders lines of text that never change for a given key through the menu layout cache.
+    """
+    return cached_render(caller, key, lambda: _lines(lines), inset=_TABLE_INSET)
+
+
 def _mode_change(caller, raw_string, **kwargs):
     choices = _nodes
-    if not (choice := partial_match(caller.ndb._menu_match.group("args"), choices)):
+    if not (args := caller.ndb._menu_match.group("args")) or not (choice := partial_match(args, choices)):
         caller.msg(f"Invalid mode. Choices are: {', '.join(choices)}")
+        return None
     return choice
 
 
 def _sheet(caller):
     target = caller.ndb.target
-    caller.msg(target.story_sheet.render())
+    caller.msg(target.story_sheet.render(), paged=True)
 
 
 def _main_options(caller):
@@ -51,6 +112,7 @@ def _template(caller, raw_string, **kwargs):
         if not target.change_type(caller.ndb._menu_match.group("args")):
             caller.msg(f"{target} is already of that nature!")
             return
+        _changed(caller, "template")
         kind = _INFLECT.a(target.full_kind_name())
         target.msg(f"You are now {kind}")
         if caller != target:
@@ -63,6 +125,7 @@ def _field(caller, raw_string, **kwargs):
     try:
         target = caller.ndb.target
         choice, value = target.set_extra_field(caller.ndb._menu_match.group("lsargs"), caller.ndb._menu_match.group("rsargs"))
+        _changed(caller, "fields")
         target.msg(f"Your {choice} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {choice} is now: {value}")
@@ -75,6 +138,24 @@ _CHARGEN = [
 ]
 
 
+def _render_fields(target):
+    text = [f"Extra Fields for {_INFLECT.a(target.full_kind_name())}:"]
+    fields = target.get_extra_fields()
+    for k, v in target.extra_fields.items():
+        match v:
+            case True:
+                text.append(f"REQUIRED FIELD: {k}")
+            case False:
+                text.append(f"OPTIONAL FIELD: {k}")
+            case _:
+                if isinstance(v, list):
+                    text.append(f"CHOICES FIELD: {k} - {', '.join(v)}")
+                else:
+                    text.append(f"UNKNOWN FIELD: {k}")
+        text.append(f"CURRENTLY: {fields.get(k, '')}")
+    return _lines(text)
+
+
 def template(caller, raw_string, **kwargs):
     options = list()
     options.append({"key": "template", "desc": "Change Template",
@@ -85,37 +166,19 @@ def template(caller, raw_string, **kwargs):
     target = caller.ndb.target
     text.append(Text(f"Template: {target}", justify='center', style="bold"))
 
-    from world.story.templates import TEMPLATES
+    from world.story.templates import TEMPLATE_INDEX
 
-    text.append("Templates:")
-    for k, v in TEMPLATES.items():
-        if isinstance(v, list):
-            text.append(f"{k}: {', '.join([x.get_type_name() for x in v])}")
-        else:
-            text.append(k)
+    text.append(_static(caller, ("template", "listing"), TEMPLATE_INDEX.listing))
 
     if caller.ndb.chargen:
-        text.extend(target.chargen_template)
+        text.append(_static(caller, ("template", "chargen", target.__class__), target.chargen_template))
 
     text.append(f"\n{target} is {_INFLECT.a(target.full_kind_name())}\n")
     if target.extra_fields:
         options.append({"key": "field", "desc": "set field",
                         "syntax": "field <name>=<value>",
                         "goto": _field})
-
-        text.append(f"Extra Fields for {_INFLECT.a(target.full_kind_name())}:")
-        for k, v in target.extra_fields.items():
-            match v:
-                case True:
-                    text.append(f"REQUIRED FIELD: {k}")
-                case False:
-                    text.append(f"OPTIONAL FIELD: {k}")
-                case _:
-                    if isinstance(v, list):
-                        text.append(f"CHOICES FIELD: {k} - {', '.join(v)}")
-                    else:
-                        text.append(f"UNKNOWN FIELD: {k}")
-            text.append(f"CURRENTLY: {target.get_extra_field(k)}")
+        text.append(_section(caller, "fields", ("fields",), lambda: _render_fields(target)))
 
     if caller.ndb.chargen:
         text.extend(_CHARGEN)
@@ -130,15 +193,7 @@ def template(caller, raw_string, **kwargs):
 
 
 def _attribute(caller, raw_string, **kwargs):
-    try:
-        target = caller.ndb.target
-        stat, value = target.story_attributes.set(caller.ndb._menu_match.group("lsargs"),
-                                               caller.ndb._menu_match.group("rsargs"))
-        target.msg(f"Your {stat} is now: {value}")
-        if caller != target:
-            caller.msg(f"{target}'s {stat} is now: {value}")
-    except StoryDBException as err:
-        caller.msg(f"ERROR: {err}")
+    _set_stats(caller, "story_attributes", "attributes")
 
 
 def _favor_attribute(caller, raw_string, **kwargs):
@@ -146,6 +201,7 @@ def _favor_attribute(caller, raw_string, **kwargs):
         target = caller.ndb.target
         stat, value = target.story_attributes.set_favored(caller.ndb._menu_match.group("args"), toggle=True)
         outcome = "now Favored" if value else "no longer Favored"
+        _changed(caller, "attributes")
         target.msg(f"Your {stat} is {outcome}")
         if caller != target:
             caller.msg(f"{target}'s {stat} is {outcome}")
@@ -158,6 +214,7 @@ def _caste_attribute(caller, raw_string, **kwargs):
         target = caller.ndb.target
         stat, value = target.story_attributes.set_caste(caller.ndb._menu_match.group("args"), toggle=True)
         outcome = f"now {_INFLECT.a(target.sub_name)} Attribute" if value else f"no longer {_INFLECT.a(target.sub_name)} Attribute"
+        _changed(caller, "attributes")
         target.msg(f"Your {stat} is {outcome}")
         if caller != target:
             caller.msg(f"{target}'s {stat} is {outcome}")
@@ -170,6 +227,7 @@ def _supernal_attribute(caller, raw_string, **kwargs):
         target = caller.ndb.target
         stat, value = target.story_attributes.set_supernal(caller.ndb._menu_match.group("args"), toggle=True)
         outcome = f"now {_INFLECT.a(target.supernal_attribute_name)} Attribute" if value else f"no longer {_INFLECT.a(target.supernal_attribute_name)} Attribute"
+        _changed(caller, "attributes")
         target.msg(f"Your {stat} is {outcome}")
         if caller != target:
             caller.msg(f"{target}'s {stat} is {outcome}")
@@ -191,44 +249,68 @@ def _format_attribute(stat, target):
     return out
 
 
+def _parse_assignments(args: str) -> list:
+    """
+    Splits '<name>=<value>[,<name>=<value>...]' into (name, value) pairs.
+    """
+    out = list()
+    for entry in (args or "").split(","):
+        if not entry.strip():
+            continue
+        name, sep, value = entry.partition("=")
+        if not sep:
+            raise StoryDBException(f"'{entry.strip()}' must be in the form <name>=<value>.")
+        out.append((name.strip(), value.strip()))
+    return out
+
+
+def _set_stats(caller, handler: str, category: str):
+    try:
+        target = caller.ndb.target
+        results = getattr(target, handler).set_many(_parse_assignments(caller.ndb._menu_match.group("args")))
+        _changed(caller, category)
+        target.msg("\n".join([f"Your {stat} is now: {value}" for stat, value in results]))
+        if caller != target:
+            caller.msg("\n".join([f"{target}'s {stat} is now: {value}" for stat, value in results]))
+    except StoryDBException as err:
+        caller.msg(f"ERROR: {err}")
+
+
+def _attributes_budget(target, result):
+    text = list()
+    if target.favored_attributes or target.caste_attributes or target.supernal_attributes:
+        text.append(f"\n{_INFLECT.a(target.full_kind_name())} receives:")
+        if (budget := result.budgets.get("caste_attributes")):
+            text.append(f"{budget}, chosen from {', '.join(target.sub_attributes)}")
+        if (budget := result.budgets.get("supernal_attributes")):
+            text.append(f"{budget}, from among the selected {target.sub_name} Attributes.")
+        if (budget := result.budgets.get("favored_attributes")):
+            text.append(f"{budget}.")
+    if (budget := result.budgets.get("dots_attributes")):
+        groups = result.details["attributes"]
+        text.append(
+            f"{budget} (Physical: {groups['Physical']}, Social: {groups['Social']}, Mental: {groups['Mental']})")
+    text.extend(target.chargen_attributes)
+    text.extend([f"ERROR: {err}" for err in result.errors["attributes"]])
+    return _lines(text)
+
+
 def attributes(caller, raw_string, **kwargs):
     options = list()
     target = caller.ndb.target
     text = list()
 
     text.append(Text(f"Attributes: {target}", justify='center', style="bold"))
-    stats = target.story_attributes.all()
-    columns = Columns([_format_attribute(x, target) for x in stats])
-
-    text.append(columns)
+    text.append(_section(caller, "attributes", ("attributes",),
+                         lambda: Columns([_format_attribute(x, target) for x in target.story_attributes.all()])))
     text.append("")
 
     if caller.ndb.chargen:
-        if target.favored_attributes or target.caste_attributes or target.supernal_attributes:
-            text.append(f"\n{_INFLECT.a(target.full_kind_name())} receives:")
-            if target.caste_attributes:
-                count = [x for x in stats if x.is_caste(ignore_derived=True)]
-                text.append(
-                    f"{len(count)}/{target.caste_attributes} {target.sub_name} Attributes, chosen from {', '.join(target.sub_attributes)}")
-            if target.supernal_attributes:
-                count = [x for x in stats if x.is_supernal(ignore_derived=True)]
-                text.append(
-                    f"{len(count)}/{target.supernal_attributes} {target.supernal_ability_name} Attributes, from among the selected {target.sub_name} Attributes.")
-            if target.favored_attributes:
-                count = [x for x in stats if x.is_favored(ignore_derived=True)]
-                text.append(
-                    f"{len(count)}/{target.favored_attributes} Favored Attributes.")
-        if target.dots_attributes:
-            physical = sum([x.true_value() - 1 for x in target.story_attributes.all_physical()])
-            social = sum([x.true_value() - 1 for x in target.story_attributes.all_social()])
-            mental = sum([x.true_value() -1 for x in target.story_attributes.all_mental()])
-            count = sum([physical, social, mental])
-            text.append(
-                f"{count}/{target.dots_attributes} Attribute Dots (Physical: {physical}, Social: {social}, Mental: {mental})")
-        text.extend(target.chargen_attributes)
+        text.append(_section(caller, "attributes_budget", ("attributes",),
+                             lambda: _attributes_budget(target, _chargen(caller, target))))
 
     options.append({"key": "set", "desc": "Set Attribute Rating",
-                    "syntax": "set <attribute>=<value>",
+                    "syntax": "set <attribute>=<value>[,<attribute>=<value>...]",
                     "goto": _attribute})
 
     if target.favored_attributes:
@@ -260,15 +342,7 @@ def attributes(caller, raw_string, **kwargs):
 
 
 def _ability(caller, raw_string, **kwargs):
-    try:
-        target = caller.ndb.target
-        stat, value = target.story_abilities.set(caller.ndb._menu_match.group("lsargs"),
-                                                  caller.ndb._menu_match.group("rsargs"))
-        target.msg(f"Your {stat} is now: {value}")
-        if caller != target:
-            caller.msg(f"{target}'s {stat} is now: {value}")
-    except StoryDBException as err:
-        caller.msg(f"ERROR: {err}")
+    _set_stats(caller, "story_abilities", "abilities")
 
 
 def _favor_ability(caller, raw_string, **kwargs):
@@ -276,6 +350,7 @@ def _favor_ability(caller, raw_string, **kwargs):
         target = caller.ndb.target
         stat, value = target.story_abilities.set_favored(caller.ndb._menu_match.group("args"), toggle=True)
         outcome = "now Favored" if value else "no longer Favored"
+        _changed(caller, "abilities")
         target.msg(f"Your {stat} is {outcome}")
         if caller != target:
             caller.msg(f"{target}'s {stat} is {outcome}")
@@ -288,6 +363,7 @@ def _caste_ability(caller, raw_string, **kwargs):
         target = caller.ndb.target
         stat, value = target.story_abilities.set_caste(caller.ndb._menu_match.group("args"), toggle=True)
         outcome = f"now {_INFLECT.a(target.sub_name)} Ability" if value else f"no longer {_INFLECT.a(target.sub_name)} Ability"
+        _changed(caller, "abilities")
         target.msg(f"Your {stat} is {outcome}")
         if caller != target:
             caller.msg(f"{target}'s {stat} is {outcome}")
@@ -300,6 +376,7 @@ def _supernal_ability(caller, raw_string, **kwargs):
         target = caller.ndb.target
         stat, value = target.story_abilities.set_supernal(caller.ndb._menu_match.group("args"), toggle=True)
         outcome = f"now {_INFLECT.a(target.supernal_ability_name)} Ability" if value else f"no longer {_INFLECT.a(target.supernal_ability_name)} Ability"
+        _changed(caller, "abilities")
         target.msg(f"Your {stat} is {outcome}")
         if caller != target:
             caller.msg(f"{target}'s {stat} is {outcome}")
@@ -308,27 +385,11 @@ def _supernal_ability(caller, raw_string, **kwargs):
 
 
 def _craft(caller, raw_string, **kwargs):
-    try:
-        target = caller.ndb.target
-        stat, value = target.story_crafts.set(caller.ndb._menu_match.group("lsargs"),
-                                                 caller.ndb._menu_match.group("rsargs"))
-        target.msg(f"Your {stat} is now: {value}")
-        if caller != target:
-            caller.msg(f"{target}'s {stat} is now: {value}")
-    except StoryDBException as err:
-        caller.msg(f"ERROR: {err}")
+    _set_stats(caller, "story_crafts", "crafts")
 
 
 def _style(caller, raw_string, **kwargs):
-    try:
-        target = caller.ndb.target
-        stat, value = target.story_styles.set(caller.ndb._menu_match.group("lsargs"),
-                                                  caller.ndb._menu_match.group("rsargs"))
-        target.msg(f"Your {stat} is now: {value}")
-        if caller != target:
-            caller.msg(f"{target}'s {stat} is now: {value}")
-    except StoryDBException as err:
-        caller.msg(f"ERROR: {err}")
+    _set_stats(caller, "story_styles", "styles")
 
 
 def _format_ability(stat, target, ignore_extra=False):
@@ -346,66 +407,64 @@ def _format_ability(stat, target, ignore_extra=False):
     return out
 
 
+def _render_extra_abilities(title: str, stats: list, target):
+    if not stats:
+        return Group()
+    return Group(Text(title, justify='center', style="bold"),
+                 Columns([_format_ability(x, target, ignore_extra=True) for x in stats]), "")
+
+
+def _abilities_budget(target, result):
+    text = list()
+    if target.favored_abilities or target.caste_abilities or target.supernal_abilities:
+        text.append(f"\n{_INFLECT.a(target.full_kind_name())} receives:")
+        if (budget := result.budgets.get("caste_abilities")):
+            text.append(f"{budget}, chosen from {', '.join(target.sub_abilities)}")
+        if (budget := result.budgets.get("supernal_abilities")):
+            text.append(f"{budget}, from among the selected {target.sub_name} Abilities.")
+        if (budget := result.budgets.get("favored_abilities")):
+            text.append(f"{budget}.")
+    if (budget := result.budgets.get("dots_abilities")):
+        details = result.details["abilities"]
+        text.append(f"{budget} (Crafts: {details['Crafts']}, Styles: {details['Styles']})")
+    if (budget := result.budgets.get("dots_specialties")):
+        text.append(str(budget))
+    text.extend(target.chargen_abilities)
+    text.extend([f"ERROR: {err}" for err in result.errors["abilities"]])
+    return _lines(text)
+
+
 def abilities(caller, raw_string, **kwargs):
     options = list()
     target = caller.ndb.target
     text = list()
     text.append(Text(f"Abilities: {target}", justify='center', style="bold"))
 
-    stats = target.story_abilities.all()
-    columns = Columns([_format_ability(x, target) for x in stats])
-
-    text.append(columns)
-
-    if (crafts := target.story_crafts.all()):
-        text.append(Text(f"Crafts", justify='center', style="bold"))
-        columns = Columns([_format_ability(x, target, ignore_extra=True) for x in crafts])
-        text.append(columns)
-        text.append("")
+    text.append(_section(caller, "abilities", ("abilities", "crafts", "styles"),
+                         lambda: Columns([_format_ability(x, target) for x in target.story_abilities.all()])))
+    text.append(_section(caller, "crafts", ("crafts",),
+                         lambda: _render_extra_abilities("Crafts", target.story_crafts.all(), target)))
+    text.append(_section(caller, "styles", ("styles",),
+                         lambda: _render_extra_abilities("Styles", target.story_styles.all(), target)))
 
-    if (styles := target.story_styles.all()):
-        text.append(Text(f"Styles", justify='center', style="bold"))
-        columns = Columns([_format_ability(x, target, ignore_extra=True) for x in styles])
-        text.append(columns)
-        text.append("")
-
-    text.append("Martial Arts and Craft cannot be assigned a rating directly. Their displayed rating is equal to the highest taken Crafts or MA Style.")
+    notes = ["Martial Arts and Craft cannot be assigned a rating directly. Their displayed rating is equal to the highest taken Crafts or MA Style."]
     if target.caste_abilities or target.favored_abilities:
-        text.append(f"Martial Arts cannot be picked as a Favored or {target.sub_name} Ability directly.")
-        text.append(f"It inherits the status of Brawl.")
+        notes.append(f"Martial Arts cannot be picked as a Favored or {target.sub_name} Ability directly.")
+        notes.append(f"It inherits the status of Brawl.")
         if target.supernal_abilities:
-            text.append(f"Martial Art can be chosen as a {target.supernal_ability_name} Ability if Brawl is a {target.sub_name} Ability.")
+            notes.append(f"Martial Art can be chosen as a {target.supernal_ability_name} Ability if Brawl is a {target.sub_name} Ability.")
+    text.append(_static(caller, ("abilities", "notes", target.__class__), notes))
 
     if caller.ndb.chargen:
-        if target.favored_abilities or target.caste_abilities or target.supernal_abilities:
-            text.append(f"\n{_INFLECT.a(target.full_kind_name())} receives:")
-            if target.caste_abilities:
-                count = [x for x in stats if x.is_caste(ignore_derived=True)]
-                text.append(f"{len(count)}/{target.caste_abilities} {target.sub_name} Abilities, chosen from {', '.join(target.sub_abilities)}")
-            if target.supernal_abilities:
-                count = [x for x in stats if x.is_supernal(ignore_derived=True)]
-                text.append(
-                    f"{len(count)}/{target.supernal_abilities} {target.supernal_ability_name} Abilities, from among the selected {target.sub_name} Abilities.")
-            if target.favored_abilities:
-                count = [x for x in stats if x.is_favored(ignore_derived=True)]
-                text.append(
-                    f"{len(count)}/{target.favored_abilities} Favored Abilities.")
-            if target.dots_abilities:
-                count = sum([x.true_value() for x in stats])
-                styles = sum([x.true_value() for x in target.story_styles.all()])
-                craft_count = sum([x.true_value() for x in crafts])
-                text.append(f"{sum([count, styles, craft_count])}/{target.dots_abilities} Ability Dots (Crafts: {craft_count}, Styles: {styles})")
-            if target.dots_specialties:
-                count = len(target.story_abilities.all_specialties())
-                text.append(f"{count}/{target.dots_specialties} Specialtiy Dots")
-        text.extend(target.chargen_abilities)
+        text.append(_section(caller, "abilities_budget", ("abilities", "crafts", "styles", "specialties"),
+                             lambda: _abilities_budget(target, _chargen(caller, target))))
 
 
     if caller.ndb.chargen:
         text.extend(_CHARGEN)
 
     options.append({"key": "set", "desc": "Set Ability Rating",
-                    "syntax": "set <ability>=<value>",
+                    "syntax": "set <ability>=<value>[,<ability>=<value>...]",
                     "goto": _ability})
 
     if target.favored_abilities:
@@ -424,11 +483,11 @@ def abilities(caller, raw_string, **kwargs):
                         "goto": _supernal_ability})
 
     options.append({"key": "craft", "desc": "Set Craft Rating",
-                    "syntax": "craft <craft>=<value>",
+                    "syntax": "craft <craft>=<value>[,<craft>=<value>...]",
                     "goto": _craft})
 
     options.append({"key": "style", "desc": "Set Style Rating",
-                    "syntax": "style <style>=<value>",
+                    "syntax": "style <style>=<value>[,<style>=<value>...]",
                     "goto": _style})
 
     table = _table()
@@ -462,6 +521,7 @@ def _charm(caller, raw_string, **kwargs):
         target = caller.ndb.target
         power, value = target.story_charms.add(caller.ndb._menu_match.group("lsargs"),
                                               caller.ndb._menu_match.group("rsargs"))
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -474,6 +534,7 @@ def _delcharm(caller, raw_string, **kwargs):
         target = caller.ndb.target
         power, value = target.story_charms.remove(caller.ndb._menu_match.group("lsargs"),
                                                caller.ndb._menu_match.group("rsargs"))
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -486,6 +547,7 @@ def _spell(caller, raw_string, **kwargs):
         target = caller.ndb.target
         power, value = target.story_spells.add(caller.ndb._menu_match.group("lsargs"),
                                                caller.ndb._menu_match.group("rsargs"))
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -498,6 +560,7 @@ def _delspell(caller, raw_string, **kwargs):
         target = caller.ndb.target
         power, value = target.story_spells.remove(caller.ndb._menu_match.group("lsargs"),
                                                   caller.ndb._menu_match.group("rsargs"))
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -513,6 +576,7 @@ def _ocharm(caller, raw_string, **kwargs):
             raise StoryDBException("usage: ocharm <kind>/<category>=<name>")
         power, value = target.story_charms.add(args[1],
                                                caller.ndb._menu_match.group("rsargs"), main_category=args[0])
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -528,6 +592,7 @@ def _delocharm(caller, raw_string, **kwargs):
             raise StoryDBException("usage: ocharm <kind>/<category>=<name>")
         power, value = target.story_charms.remove(args[1],
                                                caller.ndb._menu_match.group("rsargs"), main_category=args[0])
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -541,6 +606,7 @@ def _macharm(caller, raw_string, **kwargs):
         power, value = target.story_charms.add(caller.ndb._menu_match.group("lsargs"),
                                                caller.ndb._menu_match.group("rsargs"),
                                                main_category="Martial Arts")
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -554,6 +620,7 @@ def _delmacharm(caller, raw_string, **kwargs):
         power, value = target.story_charms.remove(caller.ndb._menu_match.group("lsargs"),
                                                caller.ndb._menu_match.group("rsargs"),
                                                main_category="Martial Arts")
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -566,6 +633,7 @@ def _evocation(caller, raw_string, **kwargs):
         target = caller.ndb.target
         power, value = target.story_evocations.add(caller.ndb._menu_match.group("lsargs"),
                                                caller.ndb._menu_match.group("rsargs"))
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -578,6 +646,7 @@ def _delevocation(caller, raw_string, **kwargs):
         target = caller.ndb.target
         power, value = target.story_evocations.remove(caller.ndb._menu_match.group("lsargs"),
                                                    caller.ndb._menu_match.group("rsargs"))
+        _changed(caller, "powers")
         target.msg(f"Your {power} is now: {value}")
         if caller != target:
             caller.msg(f"{target}'s {power} is now: {value}")
@@ -591,13 +660,9 @@ def _format_power(power, target, ignore_extra=False):
     return str(power)
 
 
-def powers(caller, raw_string, **kwargs):
-    options = list()
+def _render_powers(charms, spells, evocations, target):
     text = list()
-    target = caller.ndb.target
-    text.append(Text(f"Powers: {target}", justify='center', style="bold"))
-
-    if (charms := target.story_charms.all_main()):
+    if charms:
         text.append(Text(f"Charms", justify='center', style="bold"))
         for category, _subcat in charms.items():
             for subcat, entries in _subcat.items():
@@ -606,7 +671,7 @@ def powers(caller, raw_string, **kwargs):
                 text.append(columns)
         text.append("")
 
-    if (spells := target.story_spells.all_main()):
+    if spells:
         text.append(Text(f"Spells", justify='center', style="bold"))
         for category, _subcat in spells.items():
             for subcat, entries in _subcat.items():
@@ -615,22 +680,40 @@ def powers(caller, raw_string, **kwargs):
                 text.append(columns)
         text.append("")
 
-    if (evocations := target.story_evocations.all_main()):
+    if evocations:
         for category, entries in evocations["Evocations"].items():
             text.append(Text(f"Evocations: {category}", justify='center', style='bold'))
             columns = Columns([_format_power(x, target, ignore_extra=True) for x in entries])
             text.append(columns)
         text.append("")
+    return _lines(text)
+
+
+def _powers_budget(target, result):
+    text = [f"\n{_INFLECT.a(target.full_kind_name())} receives:"]
+    if (budget := result.budgets.get("starting_charms")):
+        text.append(f"{budget}.")
+    text.extend(target.chargen_powers)
+    text.extend([f"ERROR: {err}" for err in result.errors["powers"]])
+    return _lines(text)
 
-    if caller.ndb.chargen:
-        text.append(f"\n{_INFLECT.a(target.full_kind_name())} receives:")
-        if target.starting_charms:
-            charms_count = target.story_charms.count()
-            spells_count = target.story_spells.count()
-            evocations_count = target.story_evocations.count()
-            text.append(f"{charms_count+spells_count+evocations_count}/{target.starting_charms} starting Charms/Spells/Evocations.")
-        text.extend(target.chargen_powers)
 
+def powers(caller, raw_string, **kwargs):
+    options = list()
+    text = list()
+    target = caller.ndb.target
+    text.append(Text(f"Powers: {target}", justify='center', style="bold"))
+
+    # the snapshot is only reloaded after a power is written, so option checks below cost no queries.
+    snapshot = target.story_snapshot.get()
+    charms = dict(snapshot.powers["Charms"])
+    spells = dict(snapshot.powers["Spells"])
+    evocations = dict(snapshot.powers["Evocations"])
+
+    text.append(_section(caller, "powers", ("powers",), lambda: _render_powers(charms, spells, evocations, target)))
+
+    if caller.ndb.chargen:
+        text.append(_section(caller, "powers_budget", ("powers",), lambda: _powers_budget(target, _chargen(caller, target, snapshot))))
 
     if CHARM_CATEGORIES.get(target.native_charm_category()):
         options.append({"key": "charm", "desc": "Add a native Charm. Add again to repurchase.",
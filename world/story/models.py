@@ -94,3 +94,16 @@ class CharacterMerit(models.Model):
 
     def __str__(self):
         return str(self.merit)
+
+
+class CharacterField(models.Model):
+    owner = models.ForeignKey("objects.ObjectDB", on_delete=models.CASCADE, related_name="db_extra_fields")
+    field = models.CharField(max_length=80, null=False, blank=False)
+    value = models.CharField(max_length=255, null=False, blank=False)
+
+    class Meta:
+        unique_together = (("owner", "field"),)
+        indexes = [models.Index(fields=["field", "value"])]
+
+    def __str__(self):
+        return f"{self.field}: {self.value}"
@@ -77,6 +77,7 @@ class PowerNameHandler(BaseHandler):
         row, created = self.owner.db_powers.get_or_create(power=power)
         row.value = value
         row.save()
+        self.invalidate()
         return row, row.value
 
     def add(self, sub_category: str, name: str, main_category: str = None):
@@ -88,6 +89,7 @@ class PowerNameHandler(BaseHandler):
         if not created:
             row.value += 1
         row.save()
+        self.invalidate()
         return row, row.value
 
     def remove(self, sub_category: str, name: str, main_category: str = None):
@@ -104,6 +106,7 @@ class PowerNameHandler(BaseHandler):
             row.save()
         if not row.value:
             row.delete()
+        self.invalidate()
         return row, row.value
 
     def all(self):
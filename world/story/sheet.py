@@ -4,10 +4,12 @@ from django.conf import settings
 from rich.panel import Panel
 from rich.columns import Columns
 from rich.text import Text
+from rich.style import Style
 from rich.table import Table
 from rich.layout import Layout
 from rich.console import NewLine
 from rich.box import ASCII2, ASCII
+from world.story.snapshot import StatSnapshot
 
 
 class SheetHandler:
@@ -16,28 +18,109 @@ class SheetHandler:
     def __init__(self, owner):
         self.owner = owner
 
+    @classmethod
+    def compile_styles(cls, sheet_colors: dict) -> dict:
+        """
+        Merges base_colors with a template's sheet_colors and parses them into Rich Style objects once,
+        so that rendering never has to parse a style string again.
+        """
+        colors = dict(cls.base_colors)
+        colors.update(sheet_colors)
+        return {k: Style.parse(v) for k, v in colors.items() if v}
+
     def colors(self):
-        colors = dict(self.base_colors)
-        colors.update(self.owner.sheet_colors)
-        return colors
+        if (styles := getattr(self.owner, "sheet_styles", None)) is None:
+            styles = self.compile_styles(getattr(self.owner, "sheet_colors", dict()))
+        return styles
+
+    def stat_style(self, stat, colors):
+        if stat.is_supernal():
+            return colors.get("stat_supernal")
+        if stat.is_caste():
+            return colors.get("stat_caste")
+        if stat.is_favored():
+            return colors.get("stat_favored")
+        return colors.get("stat_name")
 
     def render_stat(self, stat, colors=None):
         if colors is None:
             colors = self.colors()
-        out = Text("", justify="right")
+        out = Text(justify="right")
+        out.append(str(stat), style=self.stat_style(stat, colors))
+        out.append(f"{stat.calculated_value():>2}", style=colors.get("stat_value"))
+        return out
 
-        if stat.is_supernal():
-            out.append(Text(str(stat), style=colors.get("stat_supernal")))
-        elif stat.is_caste():
-            out.append(Text(str(stat), style=colors.get("stat_caste")))
-        elif stat.is_favored():
-            out.append(Text(str(stat), style=colors.get("stat_favored")))
-        else:
-            out.append(Text(str(stat), style=colors.get("stat_name")))
-        #out.append(" ")
-        out.append(Text(f"{stat.calculated_value():>2}", style=colors.get("stat_value")))
+    def row_style(self, row, colors):
+        if row.flag_2 == 1:
+            return colors.get("stat_supernal")
+        if row.flag_1 == 2:
+            return colors.get("stat_caste")
+        if row.flag_1 == 1:
+            return colors.get("stat_favored")
+        return colors.get("stat_name")
+
+    def render_row(self, name: str, value: int, row=None, colors=None):
+        """
+        Renders a stat line straight from snapshot data, without touching any _Stat or its model.
+        """
+        if colors is None:
+            colors = self.colors()
+        out = Text(justify="right")
+        out.append(name, style=self.row_style(row, colors) if row is not None else colors.get("stat_name"))
+        out.append(f"{value:>2}", style=colors.get("stat_value"))
         return out
 
+    def render_summary(self, snapshot: StatSnapshot = None):
+        """
+        A condensed sheet meant for staff reviewing many characters at once. Reads only from the snapshot.
+        """
+        from world.story.stats import ATTRIBUTES, ABILITIES
+        if snapshot is None:
+            snapshot = self.owner.story_snapshot.get()
+        colors = self.colors()
+
+        table = Table(box=ASCII2, safe_box=True, padding=(0, 0, 0, 0), collapse_padding=True,
+                      pad_edge=False, expand=True, show_header=False, border_style=colors.get("border"))
+        table.add_column(ratio=1)
+        table.add_column(ratio=4)
+
+        left = [self.text_header(f"{self.owner.key}", colors=colors)]
+        if (full_kind_name := getattr(self.owner, "full_kind_name", None)):
+            left.append(Text(full_kind_name(), justify="center"))
+        attributes = Columns()
+        for attr in ATTRIBUTES:
+            name = str(attr)
+            attributes.add_renderable(self.render_row(name, snapshot.value("Attributes", name, attr.default_value),
+                                                      row=snapshot.get("Attributes", name), colors=colors))
+        left.append(attributes)
+
+        right = list()
+        abilities = Columns()
+        for abil in ABILITIES:
+            name = str(abil)
+            if (check_path := getattr(abil, "check_path", None)):
+                value = snapshot.max_value(check_path)
+            else:
+                value = snapshot.value("Abilities", name)
+            if value:
+                abilities.add_renderable(self.render_row(name, value, row=snapshot.get("Abilities", name),
+                                                         colors=colors))
+        right.append(self.text_header("Abilities", colors=colors))
+        right.append(abilities)
+
+        if (specialties := snapshot.all_specialties()):
+            right.append(self.text_header("Specialties", colors=colors))
+            right.append(self.render_specialties(specialties, colors=colors))
+
+        counts = [f"{root}: {count}" for root in ("Charms", "Spells", "Evocations")
+                  if (count := snapshot.power_count(root))]
+        if counts:
+            right.append(self.text_header("Powers", colors=colors))
+            right.append(Text(", ".join(counts)))
+
+        table.add_row(Group(*left), Group(*right))
+        return table
+
     def render_stats(self, stats, colors: dict=None):
         if colors is None:
             colors = self.colors()
@@ -47,17 +130,14 @@ class SheetHandler:
         return render
 
     def get_specialties(self):
-        out = list()
-        for cat in ("story_attributes", "story_abilities"):
-            out.extend(getattr(self.owner, cat).all_specialties())
-        return out
+        return self.owner.story_snapshot.get().all_specialties()
 
     def render_specialties(self, specialties, colors: dict = None):
         if colors is None:
             colors = self.colors()
         render = Columns()
-        for spec in specialties:
-            render.add_renderable(Text(f"{spec.stat.name_2}/{spec.stat.name_3}"))
+        for stat, name, value in specialties:
+            render.add_renderable(self.render_row(f"{stat}/{name}", value, colors=colors))
         return render
 
     @group()
@@ -75,23 +155,23 @@ class SheetHandler:
         left = list()
         right = list()
 
-        left.append(self.text_header("Attributes"))
-        left.append(self.render_stats(self.owner.story_attributes.all()))
+        left.append(self.text_header("Attributes", colors=colors))
+        left.append(self.render_stats(self.owner.story_attributes.all(), colors=colors))
 
         if (abil_stats := [abil for abil in self.owner.story_abilities.all() if abil.should_display()]):
-            right.append(self.text_header("Abilities"))
+            right.append(self.text_header("Abilities", colors=colors))
             right.append(self.render_stats(abil_stats, colors=colors))
 
         if (craft_stats := [stat for stat in self.owner.story_crafts.all() if stat.should_display()]):
-            right.append(self.text_header("Crafts"))
+            right.append(self.text_header("Crafts", colors=colors))
             right.append(self.render_stats(craft_stats, colors=colors))
 
         if (style_stats := [stat for stat in self.owner.story_styles.all() if stat.should_display()]):
-            right.append(self.text_header("Styles"))
+            right.append(self.text_header("Styles", colors=colors))
             right.append(self.render_stats(style_stats, colors=colors))
 
         if (specialties := self.get_specialties()):
-            right.append(self.text_header("Specialties"))
+            right.append(self.text_header("Specialties", colors=colors))
             right.append(self.render_specialties(specialties, colors=colors))
 
         table.add_row(Group(*left), Group(*right))
@@ -109,7 +189,7 @@ class SheetHandler:
                       pad_edge=False, expand=True, show_header=False, border_style=colors.get("border"))
             evocations.add_column()
             evo = list()
-            evo.append(self.text_header("Evocations"))
+            evo.append(self.text_header("Evocations", colors=colors))
             evo.extend(self.render_powersection(evocations_all, "Evocations", "Evocations", colors=colors))
             evocations.add_row(Group(*evo))
             yield evocations
@@ -142,7 +222,7 @@ class SheetHandler:
         for category in categories:
             if ch:
                 ch.append(NewLine())
-            ch.append(self.text_header(f"{category} {name}"))
+            ch.append(self.text_header(f"{category} {name}", colors=colors))
             ch.extend(self.render_powersection(powers_dict[category], title=title, name=name, colors=colors))
         powers.add_row(Group(*ch))
 
@@ -151,7 +231,17 @@ class SheetHandler:
     def text_header(self, name: str, colors: dict = None, color_name: str = "stat_header", border_name: str = "border"):
         if colors is None:
             colors = self.colors()
-        sides = Text("==", style=colors.get(border_name))
-        header = sides + Text(name, style=colors.get(color_name)) + sides
-        header.justify = "center"
-        return header
\ No newline at end of file
+        border = colors.get(border_name)
+        return Text.assemble(("==", border), (name, colors.get(color_name)), ("==", border), justify="center")
+
+
+def render_summaries(characters, page_size: int = 10):
+    """
+    Yields one Group of sheet summaries per page of characters. Each page costs one StatSnapshot.load(),
+    so memory and query count stay bounded no matter how many characters are requested.
+    """
+    characters = list(characters)
+    for i in range(0, len(characters), page_size):
+        page = characters[i:i + page_size]
+        snapshots = StatSnapshot.load(page)
+        yield Group(*[c.story_sheet.render_summary(snapshots[c.id]) for c in page])
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from itertools import count
+from world.story.models import CharacterStat, CharacterSpecialty, CharacterPower
+
+
+class StatSnapshot:
+    """
+    A read-only, in-memory view of one character's stats, specialties and powers.
+
+    Snapshots are loaded in bulk by StatSnapshot.load(), which costs the same three queries whether it is
+    given one character or fifty. Anything that only needs to read a sheet should work from a snapshot.
+    """
+
+    def __init__(self, owner_id: int):
+        self.owner_id = owner_id
+        # category -> stat name -> CharacterStat
+        self.stats = defaultdict(dict)
+        # category -> [(stat name, specialty name, value)]
+        self.specialties = defaultdict(list)
+        # root -> category -> subcategory -> [CharacterPower]
+        self.powers = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+
+    @classmethod
+    def load(cls, owners) -> dict:
+        """
+        Loads snapshots for every owner given, keyed by owner id.
+        """
+        owner_ids = [o.id for o in owners]
+        out = {o: cls(o) for o in owner_ids}
+
+        for row in CharacterStat.objects.filter(owner_id__in=owner_ids).select_related("stat"):
+            out[row.owner_id].stats[row.stat.category][row.stat.name] = row
+
+        for spec in CharacterSpecialty.objects.filter(stat__owner_id__in=owner_ids).select_related(
+                "stat__stat").order_by("stat__stat__category", "stat__stat__name", "name"):
+            stat = spec.stat.stat
+            out[spec.stat.owner_id].specialties[stat.category].append((stat.name, spec.name, spec.value))
+
+        for row in CharacterPower.objects.filter(owner_id__in=owner_ids).select_related("power").order_by(
+                "power__category", "power__subcategory", "power__name"):
+            power = row.power
+            out[row.owner_id].powers[power.root][power.category][power.subcategory].append(row)
+
+        for owner in owners:
+            owner.story_snapshot.set(out[owner.id])
+
+        return out
+
+    def get(self, category: str, name: str):
+        return self.stats[category].get(name, None)
+
+    def value(self, category: str, name: str, default: int = 0) -> int:
+        if (row := self.get(category, name)) is not None:
+            return row.value
+        return default
+
+    def max_value(self, category: str, default: int = 0) -> int:
+        if (rows := self.stats[category]):
+            return max(row.value for row in rows.values())
+        return default
+
+    def all(self, category: str) -> list:
+        return sorted(self.stats[category].values(), key=lambda x: x.stat.name)
+
+    def count(self, category: str) -> int:
+        return sum(row.value for row in self.stats[category].values())
+
+    def all_specialties(self, categories=("Attributes", "Abilities")) -> list:
+        out = list()
+        for category in categories:
+            out.extend(self.specialties[category])
+        return out
+
+    def power_count(self, root: str) -> int:
+        return sum(row.value for categories in self.powers[root].values()
+                   for entries in categories.values() for row in entries)
+
+
+# Shared by every SnapshotHandler, so a version is never reused even if a handler is replaced.
+_VERSIONS = count()
+
+
+class SnapshotHandler:
+    """
+    Holds a character's cached StatSnapshot. Any write to stats, specialties, powers or extra fields must call
+    invalidate() so that the next reader reloads it. version changes on every invalidate(), so anything
+    caching renders of the sheet can tell when they are stale.
+    """
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.snapshot = None
+        self.version = next(_VERSIONS)
+
+    def get(self) -> StatSnapshot:
+        if self.snapshot is None:
+            StatSnapshot.load([self.owner])
+        return self.snapshot
+
+    def set(self, snapshot: StatSnapshot):
+        self.snapshot = snapshot
+
+    def invalidate(self):
+        self.snapshot = None
+        self.version = next(_VERSIONS)
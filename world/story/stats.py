@@ -1,4 +1,6 @@
+from copy import copy
 from evennia.utils.utils import lazy_property
+from django.db import transaction
 from django.db.models import Max
 from world.story.exceptions import StoryDBException
 from world.utils import dramatic_capitalize, partial_match
@@ -17,6 +19,8 @@ class _Stat(metaclass=MetaStat):
     max_value = 50
     default_value = 0
     stat_type = "Stat"
+    # Position in the handler's stat_classes, used for its flag bitmasks. None if not tracked.
+    index = None
 
     def __init__(self, handler):
         self.handler = handler
@@ -58,14 +62,28 @@ class _Stat(metaclass=MetaStat):
         return False
 
     def is_favored(self, ignore_derived=False) -> bool:
+        if self.index is not None:
+            return self.handler.has_flag("favored", self)
         return self.model.flag_1 == 1
 
     def is_supernal(self, ignore_derived=False) -> bool:
+        if self.index is not None:
+            return self.handler.has_flag("supernal", self)
         return self.model.flag_2 == 1
 
     def is_caste(self, ignore_derived=False) -> bool:
+        if self.index is not None:
+            return self.handler.has_flag("caste", self)
         return self.model.flag_1 == 2
 
+    def specialize(self, name: str, value: int = 1):
+        if value:
+            CharacterSpecialty.objects.update_or_create(stat=self.model, name=name, defaults={"value": value})
+        else:
+            CharacterSpecialty.objects.filter(stat=self.model, name=name).delete()
+        self.handler.invalidate()
+        return self, name, value
+
     def true_value(self):
         return self.model.value
 
@@ -75,6 +93,7 @@ class _Stat(metaclass=MetaStat):
     def set_value(self, value: int):
         self.model.value = value
         self.model.save(update_fields=["value"])
+        self.handler.invalidate()
 
     def valid_value(self, value: int):
         try:
@@ -226,6 +245,10 @@ class BaseHandler:
     def load(self):
         pass
 
+    def invalidate(self):
+        self.owner.story_snapshot.invalidate()
+        self.owner.invalidate_prompt()
+
     def good_name(self, in_name, max_length: int = 80) -> str:
         dc = dramatic_capitalize(in_name)
         if not dc:
@@ -262,6 +285,48 @@ class BaseHandler:
     def count(self):
         return sum([x.true_value() for x in self.data.values()])
 
+    def prepare(self, name: str, value: int):
+        """
+        Finds and validates a stat assignment without writing it. Returns (stat, value).
+        """
+        stat = self.find_stat(name)
+        value = stat.valid_value(value)
+        if not stat.can_set():
+            raise StoryDBException(f"{stat} cannot be set directly.")
+        return stat, value
+
+    def set_many(self, entries):
+        """
+        Validates every (name, value) pair first, then writes them all in one transaction with a single
+        bulk_update. Validation changes nothing, and any missing rows are created inside the transaction, so
+        if any entry is invalid or the write fails, nothing is written and the handler's cache is untouched.
+        """
+        staged = dict()
+        for name, value in entries:
+            stat, value = self.prepare(name, value)
+            staged[str(stat)] = (stat, value)
+        if not staged:
+            raise StoryDBException(f"Must enter at least one {self.stat_type}!")
+        try:
+            with transaction.atomic():
+                rows = list()
+                for stat, value in staged.values():
+                    row = copy(stat.model)
+                    row.value = value
+                    rows.append(row)
+                CharacterStat.objects.bulk_update(rows, ["value"])
+        except Exception:
+            # rows loaded or created in the rolled-back transaction may not exist; reload them on next use.
+            for stat, value in staged.values():
+                stat.__dict__.pop("model", None)
+                stat.__dict__.pop("stat", None)
+            raise
+        for stat, value in staged.values():
+            stat.model.value = value
+            self.data.setdefault(str(stat), stat)
+        self.invalidate()
+        return [(stat, stat.calculated_value()) for stat, value in staged.values()]
+
 
 class StatHandler(BaseHandler):
     stat_classes = []
@@ -270,15 +335,57 @@ class StatHandler(BaseHandler):
     base = None
 
     def load(self):
-        for x in self.stat_classes:
+        for i, x in enumerate(self.stat_classes):
             stat = x(self)
+            stat.index = i
             self.data[str(stat)] = stat
+        self._flags = None
+
+    @property
+    def flags(self) -> dict:
+        """
+        Bitmasks of stat indices for each of "favored", "caste" and "supernal". Loaded in one query on first
+        use and kept current by the set_* methods, so flag checks and counts never touch the stat rows.
+        """
+        if self._flags is None:
+            flags = {"favored": 0, "caste": 0, "supernal": 0}
+            for name, flag_1, flag_2 in self.owner.db_stats.filter(stat__category=self.category).values_list(
+                    "stat__name", "flag_1", "flag_2"):
+                if (stat := self.data.get(name, None)) is None:
+                    continue
+                bit = 1 << stat.index
+                if flag_1 == 1:
+                    flags["favored"] |= bit
+                elif flag_1 == 2:
+                    flags["caste"] |= bit
+                if flag_2 == 1:
+                    flags["supernal"] |= bit
+            self._flags = flags
+        return self._flags
+
+    def has_flag(self, flag: str, stat: _Stat) -> bool:
+        return bool(self.flags[flag] & (1 << stat.index))
+
+    def flag_count(self, flag: str) -> int:
+        return self.flags[flag].bit_count()
+
+    def write_flag(self, stat: _Stat, field: str, value: int):
+        """
+        Saves flag_1 or flag_2 for a stat and updates the bitmasks to match.
+        """
+        setattr(stat.model, field, value)
+        stat.model.save(update_fields=[field])
+        bit = 1 << stat.index
+        flags = self.flags
+        if field == "flag_1":
+            flags["favored"] = (flags["favored"] & ~bit) | (bit if value == 1 else 0)
+            flags["caste"] = (flags["caste"] & ~bit) | (bit if value == 2 else 0)
+        else:
+            flags["supernal"] = (flags["supernal"] & ~bit) | (bit if value == 1 else 0)
+        self.invalidate()
 
     def set(self, name: str, value: int):
-        stat = self.find_stat(name)
-        value = stat.valid_value(value)
-        if not stat.can_set():
-            raise StoryDBException(f"{stat} cannot be set directly.")
+        stat, value = self.prepare(name, value)
         stat.set_value(value)
         return stat, value
 
@@ -314,8 +421,7 @@ class StatHandler(BaseHandler):
         if toggle:
             value = not stat.is_favored(ignore_derived=True)
         if value:
-            count = len([x for x in self.data.values() if x.is_favored(ignore_derived=True)])
-            if count >= self.get_favor_count():
+            if self.flag_count("favored") >= self.get_favor_count():
                 raise StoryDBException(f"Cannot set another Favored {self.stat_type}!")
             if stat.is_favored(ignore_derived=True):
                 raise StoryDBException(f"{stat} is already a Favored {self.stat_type}!")
@@ -324,8 +430,7 @@ class StatHandler(BaseHandler):
         else:
             if not stat.is_favored(ignore_derived=True):
                 raise StoryDBException(f"{stat} is not a Favored {self.stat_type}!")
-        stat.model.flag_1 = 1 if value else 0
-        stat.model.save(update_fields=["flag_1"])
+        self.write_flag(stat, "flag_1", 1 if value else 0)
         return stat, value
 
     def set_caste(self, stat: str, value: bool = True, toggle: bool = False):
@@ -339,8 +444,7 @@ class StatHandler(BaseHandler):
         if toggle:
             value = not stat.is_caste(ignore_derived=True)
         if value:
-            count = len([x for x in self.data.values() if x.is_caste(ignore_derived=True)])
-            if count >= self.get_caste_count():
+            if self.flag_count("caste") >= self.get_caste_count():
                 raise StoryDBException(
                     f"Cannot set another {self.owner.sub_name} {self.stat_type}!")
             if stat.is_caste(ignore_derived=True):
@@ -350,8 +454,7 @@ class StatHandler(BaseHandler):
         else:
             if not stat.is_caste(ignore_derived=True):
                 raise StoryDBException(f"{stat} is not a {self.owner.sub_name} {self.stat_type}!")
-        stat.model.flag_1 = 2 if value else 0
-        stat.model.save(update_fields=["flag_1"])
+        self.write_flag(stat, "flag_1", 2 if value else 0)
         return stat, value
 
     def set_supernal(self, stat: str, value: bool = True, toggle: bool = False):
@@ -362,8 +465,7 @@ class StatHandler(BaseHandler):
         if toggle:
             value = not stat.is_supernal(ignore_derived=True)
         if value:
-            count = len([x for x in self.data.values() if x.is_supernal(ignore_derived=True)])
-            if count >= self.get_supernal_count() and value:
+            if self.flag_count("supernal") >= self.get_supernal_count():
                 raise StoryDBException(
                     f"Cannot set another {self.owner.supernal_name} {self.stat_type}!")
             if not stat.is_caste():
@@ -373,19 +475,24 @@ class StatHandler(BaseHandler):
             if not stat.is_supernal(ignore_derived=True):
                 raise StoryDBException(
                     f"{stat} is already a {self.owner.supernal_name} {self.stat_type}!")
-        stat.model.flag_2 = 1 if value else 0
-        stat.model.save(update_fields=["flag_2"])
+        self.write_flag(stat, "flag_2", 1 if value else 0)
         return stat, value
 
     def all_specialties(self):
-        return CharacterSpecialty.objects.filter(stat__owner=self.owner, stat__stat__category=self.category).order_by(
-            'stat__stat__category', 'stat__stat__name')
+        """
+        Returns (stat name, specialty name, value) tuples, read from the owner's stat snapshot.
+        """
+        return self.owner.story_snapshot.get().specialties[self.category]
 
     def reset_sub(self):
+        self.owner.db_stats.filter(stat__category=self.category).update(flag_1=0, flag_2=0)
         for stat in self.data.values():
-            stat.model.flag_1 = 0
-            stat.model.flag_2 = 0
-            stat.model.save(update_fields=["flag_1", "flag_2"])
+            # only rows already loaded need updating in memory.
+            if (row := stat.__dict__.get("model", None)) is not None:
+                row.flag_1 = 0
+                row.flag_2 = 0
+        self._flags = {"favored": 0, "caste": 0, "supernal": 0}
+        self.invalidate()
 
 
 class CustomHandler(BaseHandler):
@@ -413,18 +520,29 @@ class CustomHandler(BaseHandler):
             self.class_storage[name] = stat_class
         return stat_class
 
-    def find_stat(self, name: str):
+    def lookup_stat(self, name: str):
+        """
+        Returns the named stat, or a new one that isn't added to the handler yet.
+        """
         name = self.good_name(name)
         if not (found := self.data.get(name, None)):
             stat_class = self.get_or_create_stat_class(name)
             found = stat_class(self)
-            self.data[str(found)] = found
         return found
 
-    def set(self, name: str, value: int):
+    def find_stat(self, name: str):
+        found = self.lookup_stat(name)
+        self.data.setdefault(str(found), found)
+        return found
+
+    def prepare(self, name: str, value: int):
         value = self.valid_value(value)
-        stat = self.find_stat(name)
+        return self.lookup_stat(name), value
+
+    def set(self, name: str, value: int):
+        stat, value = self.prepare(name, value)
         stat.set_value(value)
+        self.data.setdefault(str(stat), stat)
         return stat, stat.calculated_value()
 
 
@@ -1,6 +1,18 @@
+import ast
+import re
+import hashlib
+import orjson
+import yaml
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, When, Value, F
 from .exceptions import StoryDBException
-from world.utils import partial_match
+from world.story.models import Stat, CharacterStat, CharacterField
+from world.utils import partial_match, read_data_file
 from typeclasses.characters import Character
+from world.story.sheet import SheetHandler
+from world.menu import LAYOUT_CACHE
 
 
 class Template(Character):
@@ -17,8 +29,10 @@ class Template(Character):
     dots_abilities = 28
     dots_specialties = 4
     starting_charms = 0
+    favored_requires_dots = False
     sub_name = "Caste"
     sheet_colors = {}
+    sheet_styles = SheetHandler.compile_styles(sheet_colors)
     start_advantages = {
         "Willpower": 5,
         "Essence": 1
@@ -26,30 +40,72 @@ class Template(Character):
     extra_fields = {}
     supernal_attribute_name = None
     supernal_ability_name = None
+    preset_caste_abilities = False
+    kind_name = None
+    # Compiled pool formulas: functions of the character's Essence.
+    pool_personal = None
+    pool_peripheral = None
     chargen_template = []
     chargen_attributes = []
     chargen_abilities = []
     chargen_powers = []
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.sheet_styles = SheetHandler.compile_styles(cls.sheet_colors)
 
     def at_object_creation(self):
         super().at_object_creation()
         self.story_reset()
 
     def story_reset(self):
-        for k, v in self.start_advantages.items():
-            if (stat := self.story_advantages.data[k]):
-                if stat.calculated_value() < v:
-                    stat.set_value(v)
-        self.story_attributes.reset_sub()
-        self.story_abilities.reset_sub()
-        self.attributes.clear(category="extra")
+        """
+        Puts the character's stats into the starting state for its template: starting Advantages, no
+        Caste/Favored/Supernal picks (save those the template presets) and no extra fields. All writes
+        happen in one transaction, after which the stat handlers are rebuilt once.
+        """
+        with transaction.atomic():
+            self.apply_story_reset()
+        self.reset_story_handlers()
+
+    def apply_story_reset(self):
+        from world.story.stats import ADVANTAGES
+        defaults = {str(x): x.default_value for x in ADVANTAGES}
+        advantages = self.ensure_stat_rows("Advantages", self.start_advantages.keys(), defaults)
+        castes = self.ensure_stat_rows("Abilities", self.sub_abilities if self.preset_caste_abilities else [])
+
+        self.db_stats.filter(stat__category__in=("Attributes", "Abilities")).update(flag_1=0, flag_2=0)
+        if castes:
+            self.db_stats.filter(stat_id__in=castes.values()).update(flag_1=2)
+        if advantages:
+            raise_to = [When(stat_id=advantages[k], value__lt=v, then=Value(v))
+                        for k, v in self.start_advantages.items()]
+            self.db_stats.filter(stat_id__in=advantages.values()).update(
+                value=Case(*raise_to, default=F("value")))
+        self.db_extra_fields.all().delete()
+
+    def ensure_stat_rows(self, category: str, names, defaults=None) -> dict:
+        """
+        Makes sure the character has a row for every named Stat, creating missing ones in bulk.
+        Returns a dict of stat name -> Stat id.
+        """
+        names = list(names)
+        if not names:
+            return dict()
+        defaults = defaults or dict()
+        Stat.objects.bulk_create([Stat(category=category, name=n) for n in names], ignore_conflicts=True)
+        ids = dict(Stat.objects.filter(category=category, name__in=names).values_list("name", "id"))
+        CharacterStat.objects.bulk_create([CharacterStat(owner=self, stat_id=i, value=defaults.get(n, 0))
+                                           for n, i in ids.items()], ignore_conflicts=True)
+        return ids
 
     def pool_personal_max(self):
-        pass
+        if self.pool_personal:
+            return self.pool_personal(self.get_advantage_value("Essence"))
 
     def pool_peripheral_max(self):
-        pass
+        if self.pool_peripheral:
+            return self.pool_peripheral(self.get_advantage_value("Essence"))
 
     def native_charm_category(self):
         return self.kind
@@ -58,22 +114,31 @@ class Template(Character):
         return self.story_advantages.get_value(name)
 
     def change_type(self, name: str):
-        from world.story.templates import find_template, TEMPLATES
         found = find_template(name)
-        if not isinstance(self, found):
-            self.swap_typeclass(new_typeclass=found)
-            return True
-        return False
+        if isinstance(self, found):
+            return False
+        with transaction.atomic():
+            # The character already went through creation, so only the template's own state needs
+            # to be rebuilt rather than rerunning every creation hook.
+            self.swap_typeclass(new_typeclass=found, run_start_hooks=None)
+            self.apply_story_reset()
+        self.reset_story_handlers()
+        return True
 
     @classmethod
     def get_type_name(cls):
         return getattr(cls, "type_name", cls.__name__)
 
     def full_kind_name(self):
+        if self.kind_name:
+            return self.kind_name
         return f"{self.get_type_name()} {self.sub_name} {self.kind}"
 
+    def get_extra_fields(self) -> dict:
+        return dict(self.db_extra_fields.values_list("field", "value"))
+
     def get_extra_field(self, name: str):
-        return self.attributes.get(name, category='extra', default='')
+        return self.db_extra_fields.filter(field=name).values_list("value", flat=True).first() or ''
 
     def set_extra_field(self, name: str, value: str):
         if not name:
@@ -90,445 +155,280 @@ class Template(Character):
                 if isinstance(options, list):
                     if not (value := partial_match(value, options)):
                         raise StoryDBException(f"Not a valid choice for {choice}! Choices are: {', '.join(options)}")
-        self.attributes.add(choice, value=value, category="extra")
+        if len(value) > 255:
+            raise StoryDBException(f"{choice} cannot be longer than 255 characters!")
+        CharacterField.objects.update_or_create(owner=self, field=choice, defaults={"value": value})
+        self.story_snapshot.invalidate()
         return choice, value
 
 
-class Mortal(Template):
-    kind = "Mortal"
-    sub_name = "Archetype"
-    extra_fields = {"Profession": None}
-    start_advantages = {
-        "Willpower": 3,
-        "Essence": 1
-    }
-
-
-class _Solaroid(Template):
-    favored_abilities = 5
-    caste_abilities = 5
-    chargen_abilities = ["Every Favored Ability must have at least one dot!"]
-    starting_charms = 15
-
-    def pool_personal_max(self):
-        return (self.get_advantage_value("Essence") * 3) + 10
-
-    def pool_peripheral_max(self):
-        return (self.get_advantage_value("Essence") * 7) + 26
-
-
-_DAWN = ["Archery", "Awareness", "Brawl", "Dodge", "Melee", "Resistance", "Thrown", "War"]
-_ZENITH = ["Athletics", "Integrity", "Performance", "Lore", "Presence", "Resistance", "Survival", "War"]
-_TWILIGHT = ["Bureaucracy", "Craft", "Integrity", "Investigation", "Linguistics", "Lore", "Medicine", "Occult"]
-_NIGHT = ["Athletics", "Awareness", "Dodge", "Investigation", "Larceny", "Ride", "Stealth", "Socialize"]
-_ECLIPSE = ["Bureaucracy", "Larceny", "Linguistics", "Occult", "Presence", "Ride", "Sail", "Socialize"]
-
-
-class _Solar(_Solaroid):
-    kind = "Solar"
-    sheet_colors = {"border": "bold yellow",
-                    "stat_value": "bold green",
-                    "stat_supernal": "bold yellow underline",
-                    "stat_favored": "yellow",
-                    "stat_caste": "bold yellow",
-                    "stat_header": "bold red",
-                    "power_subcategory": "bold yellow"
-                    }
-    supernal_abilities = 1
-    supernal_ability_name = "Supernal"
-    chargen_attributes = ["Solars distribute 8/6/4 Primary/Secondary/Tertiary points amongst their Attributes. Remember, each begins at 1 for free."]
-
-
-class Dawn(_Solar):
-    sub_abilities = _DAWN
-
-
-class Zenith(_Solar):
-    sub_abilities = _ZENITH
-
-
-class Twilight(_Solar):
-    sub_abilities = _TWILIGHT
-
-
-class Night(_Solar):
-    sub_abilities = _NIGHT
-
-
-class Eclipse(_Solar):
-    sub_abilities = _ECLIPSE
-
-
-class _Abyssal(_Solaroid):
-    kind = "Abyssal"
-    sheet_colors = {"border": "bold black",
-                    "stat_value": "red",
-                    "stat_supernal": "bold red underline",
-                    "stat_favored": "red",
-                    "stat_caste": "bold red",
-                    "stat_header": "not bold magenta",
-                    "power_subcategory": "bold black"
-                    }
-    supernal_abilities = 1
-    supernal_ability_name = "Chthonic"
-    chargen_attributes = ["Abyssals distribute 8/6/4 Primary/Secondary/Tertiary points amongst their Attributes. Remember, each begins at 1 for free."]
-
-
-class Dusk(_Abyssal):
-    sub_abilities = _DAWN
-
-
-class Midnight(_Abyssal):
-    sub_abilities = _ZENITH
-
-
-class Daybreak(_Abyssal):
-    sub_abilities = _TWILIGHT
-
-
-class Day(_Abyssal):
-    sub_abilities = _NIGHT
-
-
-class Moonshadow(_Abyssal):
-    sub_abilities = _ECLIPSE
-
-
-class _Infernal(_Solaroid):
-    kind = "Infernal"
-    sub_types = ["Azimuth", "Ascendant", "Horizon", "Nadir", "Penumbra"]
-    default_sub = "Azimuth"
-    sheet_colors = {"border": "bold green",
-                    "stat_value": "not bold cyan",
-                    "stat_supernal": "bold green underline",
-                    "stat_favored": "green",
-                    "stat_caste": "bold green",
-                    "stat_header": "bold cyan",
-                    "power_subcategory": "bold green"
-                    }
-    chargen_attributes = [
-        "Infernals distribute 8/6/4 Primary/Secondary/Tertiary points amongst their Attributes. Remember, each begins at 1 for free."]
-
-
-class Azimuth(_Infernal):
-    sub_abilities = _DAWN
-
-
-class Ascendant(_Infernal):
-    sub_abilities = _ZENITH
-
-
-class Horizon(_Infernal):
-    sub_abilities = _TWILIGHT
-
-
-class Nadir(_Infernal):
-    sub_abilities = _NIGHT
-
-
-class Penumbra(_Infernal):
-    sub_abilities = _ECLIPSE
-
-
-class _Lunar(Template):
-    kind = "Lunar"
-    favored_attributes = 2
-    sheet_colors = {"border": "bold cyan",
-                    "stat_value": "bold green",
-                    "stat_supernal": "bold cyan underline",
-                    "stat_favored": "cyan",
-                    "stat_caste": "bold cyan",
-                    "stat_header": "bold blue",
-                    "power_subcategory": "bold cyan"
-                    }
-
-    extra_fields = {"Spirit Shape": True,
-                    "Tell": True}
-    dots_attributes = 21
-    starting_charms = 15
-    chargen_attributes = [
-        "Lunars distribute 9/7/5 Primary/Secondary/Tertiary points amongst their Attributes. Remember, each begins at 1 for free."]
-
-    def pool_personal_max(self):
-        return (self.get_advantage_value("Essence") * 1) + 15
-
-    def pool_peripheral_max(self):
-        return (self.get_advantage_value("Essence") * 4) + 34
-
-
-class Casteless(_Lunar):
-
-    def full_kind_name(self):
-        return "Casteless Lunar"
-
-
-class _Tattooed(_Lunar):
-    caste_attributes = 2
-
-
-class FullMoon(_Tattooed):
-    type_name = "Full Moon"
-    sub_attributes = ["Dexterity", "Stamina", "Strength"]
-
-
-class ChangingMoon(_Tattooed):
-    type_name = "Changing Moon"
-    sub_attributes = ["Appearance", "Charisma", "Manipulation"]
-
-
-class NoMoon(_Tattooed):
-    type_name = "No Moon"
-    sub_attributes = ["Intelligence", "Perception", "Wits"]
-
-
-class _Sidereal(Template):
-    kind = "Sidereal"
-    sheet_colors = {"border": "bold magenta",
-                    "stat_value": "bold green",
-                    "stat_supernal": "bold magenta underline",
-                    "stat_favored": "not bold magenta",
-                    "stat_caste": "bold magenta",
-                    "stat_header": "bold blue",
-                    "power_subcategory": "bold magenta"
-                    }
-
-    def pool_personal_max(self):
-        return (self.get_advantage_value("Essence") * 2) + 9
-
-    def pool_peripheral_max(self):
-        return (self.get_advantage_value("Essence") * 6) + 25
-
-
-class Journeys(_Sidereal):
-    pass
-
-
-class Battles(_Sidereal):
-    pass
-
-
-class Endings(_Sidereal):
-    pass
-
-
-class Secrets(_Sidereal):
-    pass
-
-
-class Serenity(_Sidereal):
-    pass
-
-
-class _DragonBlood(Template):
-    kind = "Dragon-Blooded"
-    favored_abilities = 5
-    dots_specialties = 3
-    starting_charms = 15
-    sub_name = "Aspect"
-    sheet_colors = {"border": "bold red",
-                    "stat_value": "bold green",
-                    "stat_supernal": "bold red underline",
-                    "stat_favored": "not bold red",
-                    "stat_caste": "bold red",
-                    "stat_header": "bold cyan",
-                    "power_subcategory": "not bold cyan"
-                    }
-    chargen_attributes = [
-        "Dragon-Blooded distribute 8/6/4 Primary/Secondary/Tertiary points amongst their Attributes. Remember, each begins at 1 for free."]
-
-    def pool_personal_max(self):
-        return (self.get_advantage_value("Essence") * 1) + 11
-
-    def pool_peripheral_max(self):
-        return (self.get_advantage_value("Essence") * 4) + 23
-
-    def at_object_creation(self):
-        super().at_object_creation()
-        for abil in self.sub_abilities:
-            if (ab := self.story_abilities.data.get(abil, None)):
-                ab.model.flag_1 = 2
-                ab.model.save(update_fields=["flag_1"])
-
-
-class Air(_DragonBlood):
-    sub_abilities = ["Linguistics", "Lore", "Occult", "Stealth", "Thrown"]
-
-
-class Earth(_DragonBlood):
-    sub_abilities = ["Awareness", "Craft", "Integrity", "Resistance", "War"]
-
-
-class Fire(_DragonBlood):
-    sub_abilities = ["Athletics", "Dodge", "Melee", "Presence", "Socialize"]
-
-
-class Water(_DragonBlood):
-    sub_abilities = ["Brawl", "Bureaucracy", "Investigation", "Larceny", "Sail"]
-
-
-class Wood(_DragonBlood):
-    sub_abilities = ["Archery", "Medicine", "Performance", "Ride", "Survival"]
-
-
-class _Alchemical(Template):
-    kind = "Alchemical"
-
-
-class Adamant(_Alchemical):
-    pass
-
-
-class Jade(_Alchemical):
-    pass
-
-
-class Moonsilver(_Alchemical):
-    pass
-
-
-class Orichalcum(_Alchemical):
-    pass
-
-
-class Starmetal(_Alchemical):
-    pass
-
-
-class Soulsteel(_Alchemical):
-    pass
-
-
-class _Getimian(Template):
-    kind = "Getimian"
-
-
-class Spring(_Getimian):
-    pass
-
-
-class Summer(_Getimian):
-    pass
-
-
-class Autumn(_Getimian):
-    pass
-
-
-class Winter(_Getimian):
-    pass
-
-
-class _Liminal(Template):
-    kind = "Liminal"
-    sub_types = ["Blood", "Breath", "Flesh", "Marrow", "Soil"]
-
-    def pool_personal_max(self):
-        return (self.get_advantage_value("Essence") * 3) + 10
-
-    def pool_peripheral_max(self):
-        return (self.get_advantage_value("Essence") * 4) + 23
-
-
-class Blood(_Liminal):
-    pass
-
-
-class Breath(_Liminal):
-    pass
-
-
-class Flesh(_Liminal):
-    pass
-
-
-class Marrow(_Liminal):
-    pass
-
-
-class Soil(_Liminal):
-    pass
-
-
-class _CelestialPools(Template):
-
-    def pool_personal_max(self):
-        return (self.get_advantage_value("Essence") * 2) + 11
-
-    def pool_peripheral_max(self):
-        return (self.get_advantage_value("Essence") * 6) + 27
-
-
-class _TerrestrialPools(Template):
-
-    def pool_personal_max(self):
-        return self.get_advantage_value("Essence") + 11
-
-    def pool_peripheral_max(self):
-        return (self.get_advantage_value("Essence") * 4) + 23
-
-
-class _Exigent(Template):
-    kind = "Exigent"
-
-
-class Terrestrial(_TerrestrialPools, _Exigent):
-    pass
-
-
-class Celestial(_CelestialPools, _Exigent):
-    pass
-
-
-class DreamSouled(_TerrestrialPools):
-    kind = "Dream-Souled"
-    sub_name = "Tier"
-    type_name = "Dream-Souled"
-
-
-class Hearteater(_CelestialPools):
-    kind = "Hearteater"
-    sub_name = "Tier"
-
-
-class Umbral(_CelestialPools):
-    kind = "Umbral"
-    sub_name = "Tier"
-
-
-TEMPLATES = {
-    "Mortal": Mortal,
-    "Solar": [Dawn, Zenith, Twilight, Night, Eclipse],
-    "Abyssal": [Dusk, Midnight, Daybreak, Day, Moonshadow],
-    "Infernal": [Azimuth, Ascendant, Horizon, Nadir, Penumbra],
-    "Lunar": [Casteless, FullMoon, ChangingMoon, NoMoon],
-    "Sidereal": [Journeys, Battles, Endings, Secrets, Serenity],
-    "Dragon-Blooded": [Air, Earth, Fire, Water, Wood],
-    "Alchemical": [Adamant, Orichalcum, Moonsilver, Jade, Starmetal, Soulsteel],
-    "Getimian": [Spring, Summer, Autumn, Winter],
-    "Liminal": [Blood, Breath, Flesh, Marrow, Soil],
-    "Exigent": [Terrestrial, Celestial],
-    "Dream-Souled": DreamSouled,
-    "Hearteater": Hearteater,
-    "Umbral": Umbral
-}
+def move_extra_fields() -> int:
+    """
+    Moves template extra fields still stored the old way, as regular Attributes in the "extra" category on
+    characters using a Template typeclass, into CharacterField rows and deletes the Attributes. A
+    CharacterField row that already exists is kept. "extra" Attributes on anything else are left alone.
+    Called on every server start; once everything has moved it costs one query. Returns how many
+    Attributes were moved.
+    """
+    from evennia.objects.models import ObjectDB
+    from evennia.typeclasses.attributes import Attribute
+    from evennia.utils.dbserialize import from_pickle
+
+    through = ObjectDB.db_attributes.through
+    links = list(through.objects.filter(attribute__db_category="extra", attribute__db_model="objectdb",
+                                        attribute__db_attrtype__isnull=True,
+                                        objectdb__db_typeclass_path__in=TEMPLATE_INDEX.all_paths)
+                 .select_related("attribute"))
+    if not links:
+        return 0
+    rows = list()
+    for link in links:
+        if (value := from_pickle(link.attribute.db_value)) not in (None, ""):
+            rows.append(CharacterField(owner_id=link.objectdb_id, field=link.attribute.db_key,
+                                       value=str(value)[:255]))
+    with transaction.atomic():
+        CharacterField.objects.bulk_create(rows, ignore_conflicts=True)
+        Attribute.objects.filter(pk__in=[link.attribute_id for link in links]).delete()
+    return len(links)
+
+
+# Template attributes a definition file may set.
+TEMPLATE_FIELDS = ("kind", "type_name", "kind_name", "sub_name", "sub_abilities", "sub_attributes",
+                   "caste_attributes", "favored_attributes", "supernal_attributes", "caste_abilities",
+                   "favored_abilities", "supernal_abilities", "dots_attributes", "dots_abilities",
+                   "dots_specialties", "starting_charms", "favored_requires_dots", "preset_caste_abilities",
+                   "sheet_colors", "start_advantages", "extra_fields", "supernal_attribute_name",
+                   "supernal_ability_name", "chargen_template", "chargen_attributes", "chargen_abilities",
+                   "chargen_powers")
+
+_FORMULA_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.USub,
+                  ast.Constant, ast.Name, ast.Load)
+
+# class name -> compiled class. Classes are only created by the first load; reloads update their data in
+# place, so characters already in memory, and isinstance() checks against them, see the new definitions.
+_CLASSES = dict()
+
+# Class attributes a reload may replace or remove.
+_DATA_FIELDS = TEMPLATE_FIELDS + ("pool_personal", "pool_peripheral")
+
+
+def compile_formula(formula):
+    """
+    Compiles a pool formula such as "essence * 3 + 10" into a function of Essence. Only integer
+    arithmetic on the name essence is allowed.
+    """
+    text = str(formula)
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as err:
+        raise ValueError(f"Invalid pool formula '{text}': {err}")
+    for node in ast.walk(tree):
+        if not isinstance(node, _FORMULA_NODES) \
+                or (isinstance(node, ast.Name) and node.id != "essence") \
+                or (isinstance(node, ast.Constant) and type(node.value) is not int):
+            raise ValueError(f"Invalid pool formula '{text}'")
+    return eval(compile(f"lambda essence: {text}", "<pool formula>", "eval"), {"__builtins__": {}})
+
+
+def _class_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]", "", name)
+
+
+def _compile_class(name: str, base, definition: dict, updates: list):
+    """
+    Returns the class for a template definition. If a class of that name already exists it is reused, and
+    its new attributes are added to updates to be applied once the whole file has compiled. New classes
+    are only made when updates is None, on the first load.
+    """
+    attrs = dict()
+    for k, v in definition.items():
+        if k == "pools":
+            for pool, formula in v.items():
+                if pool not in ("personal", "peripheral"):
+                    raise ValueError(f"{name} has an unknown pool '{pool}'.")
+                attrs[f"pool_{pool}"] = staticmethod(compile_formula(formula))
+        elif k in TEMPLATE_FIELDS:
+            attrs[k] = v
+        else:
+            raise ValueError(f"{name} has an unknown template field '{k}'.")
+
+    if (found := _CLASSES.get(name, None)) is not None and updates is not None:
+        if found.__bases__ != (base,):
+            raise ValueError(f"{name} moved to another kind. A server reload is required.")
+        updates.append((found, attrs))
+        return found
+    if updates is not None:
+        raise ValueError(f"{name} is a new template. A server reload is required.")
+    return type(name, (base,), {"__module__": __name__, "__qualname__": name, **attrs})
+
+
+def _update_class(cls, attrs: dict):
+    for k in [k for k in cls.__dict__ if k in _DATA_FIELDS and k not in attrs]:
+        delattr(cls, k)
+    for k, v in attrs.items():
+        setattr(cls, k, v)
+
+
+def compile_templates(data: dict, updates: list = None):
+    """
+    Turns loaded template definitions into typeclasses. Returns a dict of
+    kind -> class or list of subtype classes, and a dict of class name -> class for every class used.
+    If updates is given, existing classes are reused and their new attributes collected there instead.
+    """
+    templates = dict()
+    classes = dict()
+
+    def add(found):
+        if found.__name__ in classes:
+            raise ValueError(f"More than one template compiles to the class name {found.__name__}.")
+        classes[found.__name__] = found
+        return found
+
+    for kind, definition in (data or dict()).get("templates", dict()).items():
+        definition = dict(definition or dict())
+        subtypes = definition.pop("subtypes", None)
+        definition["kind"] = kind
+        if not subtypes:
+            definition.setdefault("type_name", kind)
+            templates[kind] = add(_compile_class(_class_name(kind), Template, definition, updates))
+            continue
+        base = add(_compile_class(f"_{_class_name(kind)}", Template, definition, updates))
+        templates[kind] = [add(_compile_class(_class_name(sub), base, {"type_name": sub, **(sub_def or dict())},
+                                              updates))
+                           for sub, sub_def in subtypes.items()]
+
+    if not templates:
+        raise ValueError("No templates are defined.")
+    return templates, classes
+
+
+class TemplateIndex:
+    """
+    Lookup tables for a compiled set of templates (kind -> class or list of subtype classes). Every lowercase prefix of every kind maps to that kind, and
+    every "kind prefix/subtype prefix" pair maps straight to its class, so finding a template is a dict
+    lookup. Ties between prefixes resolve exactly as partial_match would: shortest name first, then
+    declaration order.
+    """
+
+    def __init__(self, templates: dict, digest: str = None):
+        self.templates = templates
+        # Hash of the definition file this index was compiled from.
+        self.digest = digest
+        # lowercase kind prefix -> kind name
+        self.kinds = dict()
+        # "kind prefix/subtype prefix" -> class
+        self.pairs = dict()
+        self.kind_choices = ", ".join(templates.keys())
+        # kind name -> "Dawn, Zenith, ..."
+        self.subtype_choices = dict()
+        # kind name -> typeclass paths of every class for that kind
+        self.paths = dict()
+        # typeclass path -> class
+        self.classes = dict()
+        self.listing = ["Templates:"]
+
+        for kind in sorted(templates.keys(), key=len):
+            for prefix in self.prefixes(kind):
+                self.kinds.setdefault(prefix, kind)
+
+        for kind, choices in templates.items():
+            classes = choices if isinstance(choices, list) else [choices]
+            for t in classes:
+                self.classes[f"{t.__module__}.{t.__name__}"] = t
+            self.paths[kind] = [f"{t.__module__}.{t.__name__}" for t in classes]
+            if not isinstance(choices, list):
+                self.listing.append(kind)
+                continue
+            names = ", ".join([x.get_type_name() for x in choices])
+            self.subtype_choices[kind] = names
+            self.listing.append(f"{kind}: {names}")
+            subtypes = dict()
+            for cls in sorted(choices, key=lambda x: len(x.get_type_name())):
+                for prefix in self.prefixes(cls.get_type_name()):
+                    subtypes.setdefault(prefix, cls)
+            for kind_prefix, found in self.kinds.items():
+                if found != kind:
+                    continue
+                for sub_prefix, cls in subtypes.items():
+                    self.pairs[f"{kind_prefix}/{sub_prefix}"] = cls
+
+        self.all_paths = [path for paths in self.paths.values() for path in paths]
+
+    @staticmethod
+    def prefixes(name: str):
+        lower = name.lower()
+        return [lower[:i] for i in range(len(lower) + 1)]
+
+    def find_kind(self, name: str) -> str:
+        if not (kind := self.kinds.get(name.lower(), None)):
+            raise StoryDBException(f"Template '{name}' not found. Choices are: {self.kind_choices}")
+        return kind
+
+    def find(self, name: str):
+        if not name:
+            raise StoryDBException("Must enter a Template name!")
+        words = name.split("/")
+        kind = self.find_kind(words[0])
+        choices = self.templates[kind]
+
+        # just return the first match if the value isn't a list.
+        if not isinstance(choices, list):
+            return choices
+
+        if len(words) < 2 or not (found := self.pairs.get(f"{words[0].lower()}/{words[1].lower()}", None)):
+            raise StoryDBException(f"Template '{words[0]}' not found. Choices are: {self.subtype_choices[kind]}")
+        return found
+
+
+TEMPLATE_INDEX = None
+
+
+def load_templates(path=None) -> bool:
+    """
+    Reads the template definition file and, if its contents changed since the last load, compiles it and
+    swaps in a new TEMPLATE_INDEX in one assignment. Returns whether a new index was installed.
+
+    Only the first load creates classes. Later loads update the existing classes' data in place, and
+    refuse any change to the set of classes (adding, removing or renaming a template, or moving a subtype
+    to another kind), since that needs a server reload.
+
+    Raises ValueError if the file can't be read or compiled; the current index and classes are kept.
+    """
+    global TEMPLATE_INDEX
+    path = Path(path or settings.STORY_TEMPLATES_FILE)
+    try:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        if TEMPLATE_INDEX is not None and TEMPLATE_INDEX.digest == digest:
+            return False
+        data = read_data_file(path)
+    except (OSError, yaml.YAMLError, orjson.JSONDecodeError) as err:
+        raise ValueError(f"Could not read {path}: {err}")
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} is not a YAML or JSON template file.")
+
+    updates = list() if _CLASSES else None
+    templates, classes = compile_templates(data, updates)
+    if updates is not None and (removed := set(_CLASSES) - set(classes)):
+        raise ValueError(f"{', '.join(sorted(removed))} would be removed. A server reload is required.")
+    index = TemplateIndex(templates, digest)
+
+    if updates is None:
+        _CLASSES.update(classes)
+        # Typeclass paths point at this module, so compiled classes must be importable from it.
+        globals().update(classes)
+    else:
+        for cls, attrs in updates:
+            _update_class(cls, attrs)
+        # sheet_colors may be inherited from a kind's base class, so restyle only once every class is updated.
+        for cls in _CLASSES.values():
+            cls.sheet_styles = SheetHandler.compile_styles(cls.sheet_colors)
+        LAYOUT_CACHE.clear()
+    TEMPLATE_INDEX = index
+    return True
+
+
+load_templates()
 
 
 def find_template(name: str):
-    if not name:
-        raise StoryDBException("Must enter a Template name!")
-    words = name.split("/")
-    if not (template_name := partial_match(words[0], TEMPLATES.keys())):
-        raise StoryDBException(f"Template '{words[0]}' not found. Choices are: {', '.join(TEMPLATES.keys())}")
-    choices = TEMPLATES[template_name]
-
-    # just return the first match if the value isn't a list.
-    if not isinstance(choices, list):
-        return choices
-
-    if len(words) < 2:
-        raise StoryDBException(f"Template '{words[0]}' not found. Choices are: {', '.join([getattr(x, 'type_name', x.__name__) for x in choices])}")
-
-    if not (found := partial_match(words[1], choices, key=lambda x: getattr(x, 'type_name', x.__name__))):
-        raise StoryDBException(
-            f"Template '{words[0]}' not found. Choices are: {', '.join([getattr(x, 'type_name', x.__name__) for x in choices])}")
-    return found
+    return TEMPLATE_INDEX.find(name)
@@ -1,5 +1,4 @@
 from django.conf import settings
-from world.utils import utcnow
 from twisted.internet import reactor, task
 import time
 
@@ -56,25 +55,63 @@ class System:
 
 class PlaySystem(System):
     name = "play"
-    interval = 1.0
 
     def __init__(self):
         super().__init__()
+        self.interval = settings.PLAY_HEARTBEAT_INTERVAL
         from world.plays.plays import DefaultPlay
+        from world.plays.registry import PLAYS
         self.play = DefaultPlay
+        self.registry = PLAYS
+
+    def at_start(self):
+        self.registry.rebuild(self.play.objects.all())
 
     async def update(self):
-        for play in self.play.objects.all():
-            play.last_good = utcnow()
-            if not play.sessions.count():
-                play.timeout_seconds = play.timeout_seconds + self.interval
-                if play.timeout_seconds >= settings.PLAY_TIMEOUT_SECONDS:
-                    play.at_timeout()
+        from world.plays.metrics import METRICS
+        start = time.perf_counter()
+        # timeouts are driven by self.registry.timeouts, not by this loop.
+        self.registry.flush()
+        elapsed = time.perf_counter() - start
+        METRICS.observe("tick", elapsed)
+        if elapsed > settings.PLAY_TICK_BUDGET:
+            METRICS.count("tick_overruns")
+
+    def at_stop(self):
+        super().at_stop()
+        self.registry.flush()
+        self.registry.timeouts.clear()
 
     def at_cold_start(self):
-        for play in self.play.objects.all():
-            play.at_server_cold_start()
+        # Plays left over from a crash. Nobody is connected to them, so end them all in bulk.
+        self.play.terminate_many(self.play.objects.all())
 
     def at_cold_stop(self):
-        for play in self.play.objects.all():
-            play.at_server_cold_stop()
+        self.play.terminate_many(self.play.objects.all())
+
+
+class StorySystem(System):
+    name = "story"
+
+    def at_start(self):
+        from evennia.utils import logger
+        from world.story.templates import move_extra_fields
+        if (moved := move_extra_fields()):
+            logger.log_info(f"Moved {moved} template extra fields from Attributes to CharacterField.")
+
+
+class MenuSystem(System):
+    name = "menu"
+
+    def __init__(self):
+        super().__init__()
+        self.interval = settings.MENU_SAVE_INTERVAL
+
+    async def update(self):
+        from world.menu import flush_menus
+        flush_menus()
+
+    def at_stop(self):
+        super().at_stop()
+        from world.menu import flush_menus
+        flush_menus()
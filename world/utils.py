@@ -88,6 +88,19 @@ def generate_name(prefix: str, existing, gen_length: int = 20) -> str:
         return u
 
 
+class LazyRenderable:
+    """
+    Wraps an iterable of renderables so that each one is only produced when the console gets to it.
+    Combined with ServerSession paging, anything past the pages actually read is never built.
+    """
+
+    def __init__(self, renderables: typing.Iterable):
+        self.renderables = renderables
+
+    def __rich_console__(self, console, options):
+        yield from self.renderables
+
+
 @group()
 def ev_to_rich(s: str):
     if isinstance(s, ANSIString):